@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from api.v1.routes import auth, links, analytics, ai_insight
+from api.v1.routes import auth, links, analytics, ai_insight, export
 
 
 router = APIRouter(prefix="/api/v1")
@@ -8,3 +8,4 @@ router.include_router(auth.router)
 router.include_router(links.router)
 router.include_router(analytics.router)
 router.include_router(ai_insight.router)
+router.include_router(export.router)
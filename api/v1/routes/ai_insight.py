@@ -1,11 +1,12 @@
+import json
+from typing import AsyncIterator
 from fastapi import APIRouter, Depends, Body
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from core.database import get_db
+from core.database import get_read_db
 from services.analytics import AnalyticsService
 from services.ai_insight import AIInsightService
-from services.auth import get_current_user
-from models.user import User
-from schemas.analytics import LinkAnalyticsResponse
+from services.auth import CurrentUser, get_current_user
 from schemas.ai_insight import AIPromptRequest
 
 router = APIRouter(prefix="/ai", tags=["ai"])
@@ -13,8 +14,8 @@ router = APIRouter(prefix="/ai", tags=["ai"])
 @router.post("/insights")
 async def generate_ai_insights(
     body: AIPromptRequest= Body(..., description="Your custom prompt for AI insights"),
-    db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+    user: CurrentUser = Depends(get_current_user),
 ):
     analytics_service = AnalyticsService(db, user)
     all_data = await analytics_service.get_all_links_analytics()
@@ -23,3 +24,35 @@ async def generate_ai_insights(
     insights_text = await ai_service.generate_insights(all_data.links, user_prompt=body.prompt)
 
     return {"insights": insights_text}
+
+
+async def _sse_events(chunks: AsyncIterator[str]) -> AsyncIterator[str]:
+    try:
+        async for text in chunks:
+            yield f"data: {json.dumps({'text': text})}\n\n"
+    except TimeoutError:
+        yield f"event: error\ndata: {json.dumps({'detail': 'Gemini generation timed out'})}\n\n"
+    except Exception as e:
+        yield f"event: error\ndata: {json.dumps({'detail': f'Gemini generation failed: {str(e)}'})}\n\n"
+    else:
+        yield "event: done\ndata: {}\n\n"
+
+
+@router.post("/insights/stream")
+async def stream_ai_insights(
+    body: AIPromptRequest= Body(..., description="Your custom prompt for AI insights"),
+    db: AsyncSession = Depends(get_read_db),
+    user: CurrentUser = Depends(get_current_user),
+):
+    """Same as /insights, but streamed as server-sent events while the model generates."""
+    analytics_service = AnalyticsService(db, user)
+    all_data = await analytics_service.get_all_links_analytics()
+
+    ai_service = AIInsightService()
+    prompt = ai_service.prepare_prompt(all_data.links, user_prompt=body.prompt)
+
+    return StreamingResponse(
+        _sse_events(ai_service.stream_insights(prompt)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
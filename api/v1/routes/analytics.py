@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends
+from datetime import datetime
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from core.database import get_db
+from core.config import settings
+from core.database import get_read_db
 from services.analytics import AnalyticsService
-from services.auth import get_current_user
-from models.user import User
+from services.auth import CurrentUser, get_current_user
 from schemas.analytics import LinkAnalyticsResponse, AllLinksAnalyticsResponse
 
 router = APIRouter(prefix="/analytics", tags=["analytics"])
@@ -15,11 +16,13 @@ router = APIRouter(prefix="/analytics", tags=["analytics"])
 )
 async def link_analytics(
     public_id: str,
-    db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user)
+    start: datetime | None = Query(None, description="Only count clicks from this day on"),
+    end: datetime | None = Query(None, description="Only count clicks before this time"),
+    db: AsyncSession = Depends(get_read_db),
+    user: CurrentUser = Depends(get_current_user)
 ):
     service = AnalyticsService(db, user)
-    return await service.get_link_analytics(public_id)
+    return await service.get_link_analytics(public_id, start=start, end=end)
 
 
 
@@ -28,8 +31,15 @@ async def link_analytics(
     response_model=AllLinksAnalyticsResponse
 )
 async def all_links_analytics(
-    db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user)
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
+    link_ids: list[str] | None = Query(None, description="Only include these link public IDs"),
+    start: datetime | None = Query(None, description="Only count clicks from this day on"),
+    end: datetime | None = Query(None, description="Only count clicks before this time"),
+    db: AsyncSession = Depends(get_read_db),
+    user: CurrentUser = Depends(get_current_user)
 ):
     service = AnalyticsService(db, user)
-    return await service.get_all_links_analytics()
+    return await service.get_all_links_analytics(
+        limit=limit, cursor=cursor, public_ids=link_ids, start=start, end=end
+    )
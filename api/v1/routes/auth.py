@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, Response, Form
 from sqlalchemy.ext.asyncio import AsyncSession
 from core.database import get_db
-from services.auth import register_user, authenticate_user
+from services.auth import register_user, authenticate_user, issue_tokens
 from schemas.auth import RegisterRequest, LoginRequest, LoginResponse
 
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -10,7 +10,8 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 @router.post("/register", response_model=LoginResponse)
 async def register(data: RegisterRequest, response: Response, db: AsyncSession = Depends(get_db)):
     user = await register_user(db, data.username, data.password)
-    access, refresh, public_id = await authenticate_user(db, data.username, data.password)
+    # The password was just hashed; no need to verify it again before issuing tokens.
+    access, refresh, public_id = issue_tokens(user)
 
     response.set_cookie(
         "refresh_token",
@@ -0,0 +1,37 @@
+from datetime import datetime
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from services.export import ExportFormat, ExportService, MEDIA_TYPES, get_export_service
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+
+def _export_response(body, fmt: ExportFormat, name: str) -> StreamingResponse:
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{fmt}"'}
+    )
+
+
+@router.get("/links")
+async def export_links(
+    format: ExportFormat = Query("csv"),
+    service: ExportService = Depends(get_export_service)
+):
+    return _export_response(service.export_links(format), format, "links")
+
+
+@router.get("/events")
+async def export_events(
+    format: ExportFormat = Query("csv"),
+    link_ids: list[str] | None = Query(None, description="Only include these link public IDs"),
+    start: datetime | None = Query(None, description="Only include clicks from this time on"),
+    end: datetime | None = Query(None, description="Only include clicks before this time"),
+    service: ExportService = Depends(get_export_service)
+):
+    return _export_response(
+        service.export_events(format, public_ids=link_ids, start=start, end=end),
+        format,
+        "events"
+    )
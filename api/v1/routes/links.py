@@ -1,9 +1,15 @@
-from fastapi import APIRouter, Depends
+import json
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import HttpUrl
 from core.config import settings
-from schemas.link import LinkCreate, LinkResponse
+from core.utils.hashid import HashID
+from schemas.link import LinkCreate, LinkListResponse, LinkResponse
 from services.link import LinkService, get_link_service
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/links", tags=["links"])
 
 
@@ -19,19 +25,62 @@ async def create_link_route(data: LinkCreate, service: LinkService = Depends(get
     )
 
 
-@router.get("/", response_model=list[LinkResponse])
-async def list_links(service: LinkService = Depends(get_link_service)):
-    links = await service.get_links()
-    return [
-        LinkResponse(
-            id=l.public_id,
-            title=l.title,
-            url=HttpUrl(l.url),
-            shortened_url=HttpUrl(f"{settings.HOST_URL}/{l.public_id}"),
-            created_at=l.created_at
+@router.post("/batch")
+async def create_links_batch_route(data: list[LinkCreate], service: LinkService = Depends(get_link_service)):
+    """
+    Create many links at once. Results stream back as NDJSON, one LinkResponse
+    object per line in input order, as each chunk is committed. If a chunk
+    fails, a final {"error", "index"} line reports where creation stopped.
+    """
+    if len(data) > settings.LINK_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.LINK_BATCH_MAX_SIZE} links can be created per batch"
         )
-        for l in links
-    ]
+
+    async def ndjson():
+        created = 0
+        try:
+            async for rows in service.create_links(data, settings.LINK_BATCH_CHUNK_SIZE):
+                lines = []
+                for row in rows:
+                    public_id = HashID.encode(row.id)
+                    lines.append(json.dumps({
+                        "id": public_id,
+                        "title": row.title,
+                        "url": row.url,
+                        "shortened_url": f"{settings.HOST_URL}/{public_id}",
+                        "created_at": row.created_at.isoformat(),
+                    }) + "\n")
+                created += len(rows)
+                yield "".join(lines)
+        except Exception:
+            logger.exception("Batch link creation failed after %d links", created)
+            yield json.dumps({"error": "Link creation failed", "index": created}) + "\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+
+@router.get("/", response_model=LinkListResponse)
+async def list_links(
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
+    service: LinkService = Depends(get_link_service)
+):
+    links, next_cursor = await service.get_links(cursor=cursor, limit=limit)
+    return LinkListResponse(
+        links=[
+            LinkResponse(
+                id=l.public_id,
+                title=l.title,
+                url=HttpUrl(l.url),
+                shortened_url=HttpUrl(f"{settings.HOST_URL}/{l.public_id}"),
+                created_at=l.created_at
+            )
+            for l in links
+        ],
+        next_cursor=next_cursor
+    )
 
 
 @router.get("/{link_id}", response_model=LinkResponse)
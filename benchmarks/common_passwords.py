@@ -0,0 +1,66 @@
+"""
+Common-password lookup benchmark: the in-memory set built from the gz list
+against the mmap'd sorted index. Each variant is loaded in a fresh
+interpreter so cold-start time and RSS growth are measured in isolation.
+No database is needed.
+
+    python -m benchmarks.common_passwords --lookups 200000
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+
+
+def rss_kib() -> int:
+    with open("/proc/self/statm") as f:
+        resident_pages = int(f.read().split()[1])
+    return resident_pages * resource.getpagesize() // 1024
+
+
+def measure(variant: str, lookups: int) -> dict:
+    from core.validators.password import CommonPasswordIndex, read_common_passwords
+
+    rss_before = rss_kib()
+    started = time.perf_counter()
+    passwords = read_common_passwords() if variant == "set" else CommonPasswordIndex()
+    # Touch one lookup so lazy page-ins count towards cold start.
+    "password" in passwords
+    cold_start = time.perf_counter() - started
+    rss_after = rss_kib()
+
+    words = [f"candidate{i}" if i % 2 else "password" for i in range(lookups)]
+    started = time.perf_counter()
+    for word in words:
+        word in passwords
+    per_lookup = (time.perf_counter() - started) / lookups
+
+    return {
+        "cold_start_ms": round(cold_start * 1000, 3),
+        "rss_growth_kib": rss_after - rss_before,
+        "lookup_us": round(per_lookup * 1_000_000, 3),
+    }
+
+
+def main(lookups: int):
+    results = {}
+    for variant in ("set", "index"):
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.common_passwords", "--child", variant, "--lookups", str(lookups)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        results[variant] = json.loads(output)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lookups", type=int, default=100_000)
+    parser.add_argument("--child", choices=["set", "index"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        print(json.dumps(measure(args.child, args.lookups)))
+    else:
+        main(args.lookups)
@@ -0,0 +1,54 @@
+"""
+Short-code codec benchmark: the pure-Python hashids package against the
+table-driven FastHashids used by core.utils.hashid. Codes are checked to be
+identical before timing. No database is needed.
+
+    python -m benchmarks.hashid --ids 200000
+"""
+import argparse
+import json
+import random
+import time
+
+from hashids import Hashids
+
+from core.config import settings
+from core.utils.hashid import FastHashids
+
+
+def ops_per_second(func, items) -> float:
+    started = time.perf_counter()
+    for item in items:
+        func(item)
+    return round(len(items) / (time.perf_counter() - started))
+
+
+def main(count: int):
+    reference = Hashids(salt=settings.HASHID_SALT, min_length=8)
+    fast = FastHashids(salt=settings.HASHID_SALT, min_length=8)
+
+    ids = [random.randrange(1, 10_000_000) for _ in range(count)]
+    codes = [reference.encode(i) for i in ids]
+    assert codes == [fast.encode(i) for i in ids], "codec output differs from hashids"
+
+    results = {
+        "ids": count,
+        "hashids": {
+            "encode_per_second": ops_per_second(reference.encode, ids),
+            "decode_per_second": ops_per_second(reference.decode, codes),
+        },
+        "fast": {
+            "encode_per_second": ops_per_second(fast.encode, ids),
+            "decode_per_second": ops_per_second(fast.decode, codes),
+        },
+    }
+    for op in ("encode_per_second", "decode_per_second"):
+        results[f"{op.split('_')[0]}_speedup"] = round(results["fast"][op] / results["hashids"][op], 2)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ids", type=int, default=100_000)
+    args = parser.parse_args()
+    main(args.ids)
@@ -0,0 +1,89 @@
+"""
+Import-time profile of the app (`python -X importtime -c "import main"`),
+used as a cold-start regression check.
+
+Each run imports main in a fresh interpreter; the fastest of --runs is kept.
+The check fails (exit status 1) when a module that must stay off the startup
+path shows up (the Gemini SDK and python-jose's JWT backend, which are
+loaded lazily), or when --budget-ms is given and importing main takes longer.
+The slowest modules are listed so a regression can be traced to its import.
+
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --runs 5 --budget-ms 1500 --top 20
+"""
+import argparse
+import json
+import re
+import subprocess
+import sys
+
+# Loaded on first use (see services.ai_insight.get_client and core.security._jwt).
+DEFERRED_MODULES = ("google.genai", "jose.jwt")
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def profile(target: str) -> list[dict]:
+    """One fresh-interpreter import of target; returns one entry per imported module, in import order."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        sys.exit(f"Importing {target} failed:\n{result.stderr}")
+
+    modules = []
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append({
+                "module": name,
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000,
+                "depth": len(indent) // 2,
+            })
+    return modules
+
+
+def main(args: argparse.Namespace) -> int:
+    runs = [profile(args.target) for _ in range(args.runs)]
+    totals = [next(m["cumulative_ms"] for m in run if m["module"] == args.target) for run in runs]
+    fastest = runs[totals.index(min(totals))]
+
+    deferred = [
+        d for d in DEFERRED_MODULES
+        if any(m["module"] == d or m["module"].startswith(d + ".") for m in fastest)
+    ]
+    # Direct dependencies of the target, heaviest first.
+    top_level = sorted((m for m in fastest if m["depth"] == 1), key=lambda m: m["cumulative_ms"], reverse=True)
+    slowest_self = sorted(fastest, key=lambda m: m["self_ms"], reverse=True)
+
+    results = {
+        "target": args.target,
+        "import_ms": round(min(totals), 1),
+        "runs_ms": [round(t, 1) for t in totals],
+        "modules": len(fastest),
+        "deferred_modules_imported": deferred,
+        "top_level": [{"module": m["module"], "cumulative_ms": round(m["cumulative_ms"], 1)} for m in top_level[:args.top]],
+        "slowest_self": [{"module": m["module"], "self_ms": round(m["self_ms"], 1)} for m in slowest_self[:args.top]],
+    }
+    print(json.dumps(results, indent=2))
+
+    failed = False
+    if deferred:
+        print(f"FAIL: imported at startup but should be lazy: {', '.join(deferred)}", file=sys.stderr)
+        failed = True
+    if args.budget_ms is not None and min(totals) > args.budget_ms:
+        print(f"FAIL: import {args.target} took {min(totals):.0f} ms, budget is {args.budget_ms:.0f} ms", file=sys.stderr)
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", default="main", help="module to import")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--budget-ms", type=float, help="fail if the fastest import of --target exceeds this")
+    parser.add_argument("--top", type=int, default=15, help="modules to list in each ranking")
+    sys.exit(main(parser.parse_args()))
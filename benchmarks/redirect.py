@@ -0,0 +1,129 @@
+"""
+Redirect micro-benchmark: the original handler against the lean fast path.
+
+Both apps are driven in-process through httpx's ASGI transport, so the
+numbers measure handler, session and click-recording overhead rather than
+the network. Needs DATABASE_URL pointing at a migrated database; a throwaway
+user and link are created and removed again.
+
+    python -m benchmarks.redirect --requests 20000 --concurrency 50
+    python -m benchmarks.redirect --cold   # clear the in-process cache before every request
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import uuid
+
+import httpx
+from fastapi import BackgroundTasks, Depends, FastAPI, Request
+from fastapi.responses import RedirectResponse
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from core.database import AsyncSessionLocal, get_db
+from core.utils.hashid import HashID
+from main import app as fast_app
+from models.base import Link, User
+from models.link import LinkEvent
+from services.click_ingest import click_ingestor
+from services.redirect_cache import redirect_cache
+
+
+def build_baseline_app() -> FastAPI:
+    """The redirect route as originally written: DI session, full ORM rows, one commit per click."""
+    baseline = FastAPI()
+
+    async def record_click_background(public_id: str, ip_address: str | None, user_agent: str | None,
+                                      source: str | None, db: AsyncSession):
+        result = await db.execute(select(Link).where(Link.id == HashID.decode(public_id)))
+        link = result.scalar_one()
+        db.add(LinkEvent(link_id=link.id, ip_address=ip_address, user_agent=user_agent, source=source))
+        await db.commit()
+
+    @baseline.get("/{public_id}")
+    async def redirect_link(public_id: str, request: Request, background_tasks: BackgroundTasks,
+                            db: AsyncSession = Depends(get_db)):
+        background_tasks.add_task(
+            record_click_background,
+            public_id=public_id,
+            ip_address=request.client.host,  # type: ignore
+            user_agent=request.headers.get("user-agent"),
+            source=request.query_params.get("utm_source"),
+            db=db
+        )
+        result = await db.execute(select(Link).where(Link.id == HashID.decode(public_id)))
+        link = result.scalar_one()
+        return RedirectResponse(url=link.url, status_code=settings.REDIRECT_STATUS_CODE)
+
+    return baseline
+
+
+async def drive(app: FastAPI, path: str, requests: int, concurrency: int, cold: bool) -> dict:
+    latencies: list[float] = []
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker(count: int):
+            for _ in range(count):
+                if cold:
+                    redirect_cache.local.clear()
+                started = time.perf_counter()
+                response = await client.get(path)
+                latencies.append(time.perf_counter() - started)
+                assert response.status_code == settings.REDIRECT_STATUS_CODE, response.status_code
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(requests // concurrency) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 3),
+    }
+
+
+async def main(requests: int, concurrency: int, cold: bool):
+    async with AsyncSessionLocal() as db:
+        user = User(username=f"bench_{uuid.uuid4().hex[:12]}", password_hash="!")
+        db.add(user)
+        await db.flush()
+        link = Link(user_id=user.id, title="bench", url="https://example.com/landing")
+        db.add(link)
+        await db.commit()
+
+    path = f"/{HashID.encode(link.id)}"
+    results = {}
+    try:
+        results["baseline"] = await drive(build_baseline_app(), path, requests, concurrency, cold)
+
+        await click_ingestor.start()
+        try:
+            results["fast_path"] = await drive(fast_app, path, requests, concurrency, cold)
+        finally:
+            await click_ingestor.stop()
+    finally:
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(LinkEvent).where(LinkEvent.link_id == link.id))
+            await db.execute(delete(Link).where(Link.id == link.id))
+            await db.execute(delete(User).where(User.id == user.id))
+            await db.commit()
+
+    results["speedup"] = round(
+        results["fast_path"]["requests_per_second"] / results["baseline"]["requests_per_second"], 2
+    )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=10_000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--cold", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.cold))
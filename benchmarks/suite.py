@@ -0,0 +1,330 @@
+"""
+End-to-end benchmark suite: redirect throughput, link CRUD and
+/analytics/all latency against link count, and click ingestion rate.
+
+A throwaway set of users, links and click events (with their rollups) is
+seeded into DATABASE_URL, which must point at a migrated Postgres database.
+Everything seeded is removed again at the end unless --keep is given. By
+default requests go to the ASGI app in-process (with its lifespan running).
+Pass --base-url to drive a separately started server instead, e.g.
+`uvicorn main:app --workers 4`. Ingestion is always measured in-process.
+
+Every benchmark request comes from one client address, so the redirect rate
+limiter would stop recording almost all clicks. In-process it is switched
+off unless --rate-limit is given; start a separate server with
+RATE_LIMIT_ENABLED=false for comparable numbers.
+
+Results are printed (or written with --output) as JSON tagged with the git
+commit, so runs can be compared across commits.
+
+    python -m benchmarks.suite
+    python -m benchmarks.suite --link-counts 10,1000,10000 --events-per-link 50 --output bench.json
+    python -m benchmarks.suite --base-url http://127.0.0.1:8000 --concurrency 200
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import subprocess
+import time
+import uuid
+from contextlib import AsyncExitStack
+from datetime import datetime, timedelta, timezone
+
+import httpx
+from sqlalchemy import delete, insert, select
+
+from core.config import settings
+from core.database import engine
+from core.security import create_access_token
+from core.utils.hashid import HashID
+from core.utils.user_agent import classify_user_agent
+from main import app
+from models.base import Link, User
+from models.link import LinkEvent
+from services.click_ingest import ClickIngestor
+from services.rate_limit import rate_limiter
+from services.click_rollup import (
+    apply_agent_rollups, apply_click_rollups, apply_country_rollups, apply_visitor_sketches
+)
+
+SOURCES = [None, "twitter", "newsletter", "google", "linkedin"]
+COUNTRIES = [None, "US", "GB", "DE", "IN", "BR"]
+USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0 Safari/537.36",
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_5 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.5 Mobile/15E148 Safari/604.1",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 14_5) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.5 Safari/605.1.15",
+    # A phone model containing "bot", once misclassified as a crawler.
+    "Mozilla/5.0 (Linux; Android 10; CUBOT X30) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Mobile Safari/537.36",
+]
+# httpx's own user agent is classified as a bot; present as a browser so
+# redirects take the same path as real visitors.
+BENCH_HEADERS = {"User-Agent": USER_AGENTS[0]}
+INSERT_CHUNK = 5_000
+
+
+def summarize(latencies: list[float], elapsed: float | None = None) -> dict:
+    latencies = sorted(latencies)
+    if not latencies:
+        return {"requests": 0}
+
+    def pct(p: float) -> float:
+        return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000, 3)
+
+    summary = {
+        "requests": len(latencies),
+        "p50_ms": pct(0.50),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+        "max_ms": round(latencies[-1] * 1000, 3),
+    }
+    if elapsed is not None:
+        summary["requests_per_second"] = round(len(latencies) / elapsed, 1)
+    return summary
+
+
+def random_event(link_id: int, rng: random.Random, now: datetime, days: int) -> dict:
+    user_agent = rng.choice(USER_AGENTS)
+    return {
+        "link_id": link_id,
+        "clicked_at": now - timedelta(seconds=rng.uniform(0, days * 86400)),
+        "source": rng.choice(SOURCES),
+        "ip_address": f"10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(1, 255)}",
+        "user_agent": user_agent,
+        **classify_user_agent(user_agent)._asdict(),
+        "country": rng.choice(COUNTRIES),
+    }
+
+
+async def seed(seeded: dict[int, list[int]], run_id: str, link_counts: list[int], events_per_link: int,
+               days: int, rng: random.Random):
+    """Create one user per entry of link_counts, filling seeded with {user_id: [link_id, ...]}."""
+    now = datetime.now(timezone.utc)
+
+    for index, link_count in enumerate(link_counts):
+        async with engine.begin() as conn:
+            user_id = await conn.scalar(
+                insert(User).values(username=f"bench_{run_id}_{index}", password_hash="!").returning(User.id)
+            )
+            link_ids: list[int] = []
+            for start in range(0, link_count, INSERT_CHUNK):
+                rows = [
+                    {"user_id": user_id, "title": f"bench link {n}", "url": f"https://example.com/{run_id}/{n}"}
+                    for n in range(start, min(start + INSERT_CHUNK, link_count))
+                ]
+                result = await conn.execute(insert(Link).returning(Link.id, sort_by_parameter_order=True), rows)
+                link_ids += result.scalars().all()
+        seeded[user_id] = link_ids
+
+        events: list[dict] = []
+        for link_id in link_ids:
+            events += (random_event(link_id, rng, now, days) for _ in range(events_per_link))
+            if len(events) >= INSERT_CHUNK:
+                await write_events(events)
+                events = []
+        if events:
+            await write_events(events)
+
+
+async def write_events(events: list[dict]):
+    async with engine.begin() as conn:
+        await conn.execute(insert(LinkEvent), events)
+        await apply_click_rollups(conn, events)
+        await apply_country_rollups(conn, events)
+        await apply_visitor_sketches(conn, events)
+        await apply_agent_rollups(conn, events)
+
+
+async def cleanup(user_ids: list[int]):
+    user_links = select(Link.id).where(Link.user_id.in_(user_ids))
+    async with engine.begin() as conn:
+        # Rollups go with their links (ON DELETE CASCADE); raw events don't.
+        await conn.execute(delete(LinkEvent).where(LinkEvent.link_id.in_(user_links.scalar_subquery())))
+        await conn.execute(delete(Link).where(Link.user_id.in_(user_ids)))
+        await conn.execute(delete(User).where(User.id.in_(user_ids)))
+
+
+def auth_headers(user_id: int) -> dict[str, str]:
+    return {"Authorization": f"Bearer {create_access_token(HashID.encode(user_id))}"}
+
+
+async def bench_redirect(client: httpx.AsyncClient, link_ids: list[int], requests: int, concurrency: int,
+                         rng: random.Random) -> dict:
+    paths = [f"/{HashID.encode(link_id)}" for link_id in link_ids]
+    # Touch every link once first, so the run measures steady state rather than cache fill.
+    for path in paths[:requests]:
+        await client.get(path)
+
+    latencies: list[float] = []
+    errors = 0
+
+    async def worker(count: int):
+        nonlocal errors
+        for _ in range(count):
+            path = rng.choice(paths)
+            started = time.perf_counter()
+            response = await client.get(path)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != settings.REDIRECT_STATUS_CODE:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(requests // concurrency) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {**summarize(latencies, elapsed), "concurrency": concurrency, "errors": errors}
+
+
+async def bench_link_crud(client: httpx.AsyncClient, user_id: int, requests: int) -> dict:
+    headers = auth_headers(user_id)
+    timings: dict[str, list[float]] = {"create": [], "read": [], "list": [], "delete": []}
+
+    async def timed(op: str, method: str, url: str, **kwargs) -> httpx.Response:
+        started = time.perf_counter()
+        response = await client.request(method, url, headers=headers, **kwargs)
+        timings[op].append(time.perf_counter() - started)
+        response.raise_for_status()
+        return response
+
+    for n in range(requests):
+        created = await timed("create", "POST", "/api/v1/links/", json={"title": f"crud {n}", "url": "https://example.com/crud"})
+        public_id = created.json()["id"]
+        await timed("read", "GET", f"/api/v1/links/{public_id}")
+        await timed("list", "GET", "/api/v1/links/", params={"limit": settings.PAGE_SIZE_DEFAULT})
+        await timed("delete", "DELETE", f"/api/v1/links/{public_id}")
+
+    return {op: summarize(latencies) for op, latencies in timings.items()}
+
+
+async def bench_analytics(client: httpx.AsyncClient, seeded: dict[int, list[int]], iterations: int) -> list[dict]:
+    results = []
+    for user_id, link_ids in seeded.items():
+        headers = auth_headers(user_id)
+        params = {"limit": min(len(link_ids), settings.PAGE_SIZE_MAX)}
+        latencies: list[float] = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            response = await client.get("/api/v1/analytics/all", params=params, headers=headers)
+            latencies.append(time.perf_counter() - started)
+            response.raise_for_status()
+        results.append({"link_count": len(link_ids), "page_size": params["limit"], **summarize(latencies)})
+    return results
+
+
+async def bench_ingest(link_ids: list[int], events: int, rng: random.Random) -> dict:
+    ingestor = ClickIngestor(
+        batch_size=settings.CLICK_BATCH_SIZE,
+        flush_interval=settings.CLICK_FLUSH_INTERVAL_SECONDS,
+        max_queue_size=settings.CLICK_QUEUE_MAX_SIZE,
+    )
+    await ingestor.start()
+    started = time.perf_counter()
+    for _ in range(events):
+        await ingestor.record(
+            rng.choice(link_ids),
+            ip_address="10.0.0.1",
+            user_agent=rng.choice(USER_AGENTS),
+            source=rng.choice(SOURCES),
+        )
+    enqueued = time.perf_counter() - started
+    await ingestor.stop()
+    elapsed = time.perf_counter() - started
+
+    stats = ingestor.stats()
+    return {
+        "events": events,
+        "written": stats["written"],
+        "dropped": stats["dropped"],
+        "enqueue_per_second": round(events / enqueued, 1),
+        "events_per_second": round(stats["written"] / elapsed, 1),
+        "batch_size": settings.CLICK_BATCH_SIZE,
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def main(args: argparse.Namespace):
+    rng = random.Random(args.seed)
+    run_id = uuid.uuid4().hex[:8]
+    link_counts = [int(n) for n in args.link_counts.split(",")]
+
+    # Seeded clicks must count as human, or the analytics numbers measure
+    # empty rollups.
+    bots = [ua for ua in USER_AGENTS if classify_user_agent(ua).is_bot]
+    if bots:
+        raise SystemExit(f"Benchmark user agents classified as bots: {bots}")
+
+    seeded: dict[int, list[int]] = {}
+    results = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "target": args.base_url or "in-process",
+        "params": {k: v for k, v in vars(args).items() if k not in ("output", "keep")},
+    }
+
+    try:
+        started = time.perf_counter()
+        await seed(seeded, run_id, link_counts, args.events_per_link, args.days, rng)
+        all_links = [link_id for link_ids in seeded.values() for link_id in link_ids]
+        results["seed"] = {
+            "users": len(seeded),
+            "links": len(all_links),
+            "events": len(all_links) * args.events_per_link,
+            "seconds": round(time.perf_counter() - started, 2),
+        }
+
+        async with AsyncExitStack() as stack:
+            if args.base_url:
+                client = httpx.AsyncClient(
+                    base_url=args.base_url, headers=BENCH_HEADERS, limits=httpx.Limits(max_connections=args.concurrency)
+                )
+            else:
+                rate_limiter.enabled = args.rate_limit
+                await stack.enter_async_context(app.router.lifespan_context(app))
+                client = httpx.AsyncClient(
+                    transport=httpx.ASGITransport(app=app), base_url="http://bench", headers=BENCH_HEADERS
+                )
+            await stack.enter_async_context(client)
+
+            results["redirect"] = await bench_redirect(client, all_links, args.redirect_requests, args.concurrency, rng)
+            results["link_crud"] = await bench_link_crud(client, next(iter(seeded)), args.crud_requests)
+            results["analytics_all"] = await bench_analytics(client, seeded, args.analytics_iterations)
+
+        results["ingest"] = await bench_ingest(all_links, args.ingest_events, rng)
+    finally:
+        if seeded and not args.keep:
+            await cleanup(list(seeded))
+        await engine.dispose()
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--link-counts", default="10,100,1000",
+                        help="comma-separated; one seeded user per entry, owning that many links")
+    parser.add_argument("--events-per-link", type=int, default=20)
+    parser.add_argument("--days", type=int, default=30, help="spread seeded clicks over this many days")
+    parser.add_argument("--redirect-requests", type=int, default=10_000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--crud-requests", type=int, default=200)
+    parser.add_argument("--analytics-iterations", type=int, default=20)
+    parser.add_argument("--ingest-events", type=int, default=100_000)
+    parser.add_argument("--base-url", help="drive a running server instead of the in-process app")
+    parser.add_argument("--rate-limit", action="store_true", help="keep the redirect rate limiter on in-process")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for generated data and request order")
+    parser.add_argument("--output", help="also write the JSON results to this file")
+    parser.add_argument("--keep", action="store_true", help="leave the seeded data in place")
+    asyncio.run(main(parser.parse_args()))
@@ -1,7 +1,16 @@
+from typing import Literal
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     DATABASE_URL: str
+    DATABASE_REPLICA_URL: str | None = None
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = -1
+    DB_POOL_PRE_PING: bool = False
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_POOL_WARMUP_CONNECTIONS: int = 5
     JWT_SECRET: str
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
@@ -10,6 +19,48 @@ class Settings(BaseSettings):
     HASHID_SALT: str = "your_default_salt_value"
     REDIRECT_STATUS_CODE: int = 302
     GEMINI_API_KEY: str
+    GEMINI_BASE_URL: str | None = None
+    AI_INSIGHT_TIMEOUT_SECONDS: float = 60.0
+    AI_INSIGHT_MAX_CONCURRENCY: int = 8
+    AI_INSIGHT_CACHE_MAX_ENTRIES: int = 1000
+    AI_INSIGHT_CACHE_TTL_SECONDS: int = 3600
+    AI_PROMPT_MAX_CHARS: int = 24_000
+    REDIRECT_CACHE_MAX_ENTRIES: int = 10_000
+    REDIRECT_CACHE_TTL_SECONDS: int = 300
+    REDIRECT_CACHE_WARMUP_LINKS: int = 1000
+    REDIS_URL: str | None = None
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIRECT_REDIS_TTL_SECONDS: int = 3600
+    REDIRECT_NEGATIVE_TTL_SECONDS: int = 30
+    CLICK_BATCH_SIZE: int = 1000
+    CLICK_FLUSH_INTERVAL_SECONDS: float = 1.0
+    CLICK_QUEUE_MAX_SIZE: int = 50_000
+    BOT_CLICK_POLICY: str = "tag"
+    USER_AGENT_CACHE_MAX_ENTRIES: int = 50_000
+    GEOIP_DATABASE_PATH: str | None = None
+    GEOIP_CACHE_MAX_ENTRIES: int = 100_000
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_POLICY: Literal["skip", "reject"] = "skip"
+    RATE_LIMIT_BACKEND: Literal["memory", "redis"] = "memory"
+    RATE_LIMIT_IP_PER_SECOND: float = 20.0
+    RATE_LIMIT_IP_BURST: int = 100
+    RATE_LIMIT_LINK_PER_SECOND: float = 1.0
+    RATE_LIMIT_LINK_BURST: int = 10
+    RATE_LIMIT_SHARDS: int = 64
+    RATE_LIMIT_MAX_BUCKETS_PER_SHARD: int = 8_192
+    RATE_LIMIT_COMPACT_INTERVAL_SECONDS: float = 60.0
+    EVENT_PARTITION_MONTHS_AHEAD: int = 3
+    EVENT_PARTITION_CHECK_INTERVAL_SECONDS: int = 6 * 60 * 60
+    LINK_BATCH_MAX_SIZE: int = 50_000
+    LINK_BATCH_CHUNK_SIZE: int = 1000
+    EXPORT_FETCH_SIZE: int = 5000
+    PAGE_SIZE_DEFAULT: int = 100
+    PAGE_SIZE_MAX: int = 1000
+    AUTH_CACHE_MAX_ENTRIES: int = 10_000
+    AUTH_CACHE_TTL_SECONDS: int = 60
+    PASSWORD_HASH_EXECUTOR: str = "thread"
+    PASSWORD_HASH_WORKERS: int = 4
+    STARTUP_WARMUP_TIMEOUT_SECONDS: float = 10.0
 
     class Config:
         env_file = ".env"
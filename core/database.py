@@ -1,16 +1,123 @@
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+import time
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncEngine, AsyncSession
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from core.config import settings
 
-engine = create_async_engine(settings.DATABASE_URL, echo=False)
+
+class PoolStats:
+    """How long requests wait to check out a connection from one engine's pool."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.checkout_seconds_total = 0.0
+        self.checkout_seconds_max = 0.0
+        self.timeouts = 0
+
+    def record(self, seconds: float):
+        self.checkouts += 1
+        self.checkout_seconds_total += seconds
+        if seconds > self.checkout_seconds_max:
+            self.checkout_seconds_max = seconds
+
+
+def _timed_pool(stats: PoolStats) -> type[AsyncAdaptedQueuePool]:
+    # A class per engine, so the stats survive pool.recreate() (which
+    # instantiates self.__class__) on dispose or invalidation.
+    class TimedQueuePool(AsyncAdaptedQueuePool):
+        def connect(self):
+            started = time.perf_counter()
+            try:
+                return super().connect()
+            except PoolTimeoutError:
+                stats.timeouts += 1
+                raise
+            finally:
+                stats.record(time.perf_counter() - started)
+
+    return TimedQueuePool
+
+
+def _create_engine(url: str, stats: PoolStats) -> AsyncEngine:
+    connect_args = {}
+    if url.startswith("postgresql+asyncpg"):
+        # asyncpg keeps one cache for its own statements and SQLAlchemy's
+        # adapter another for prepared ones; behind PgBouncer in transaction
+        # mode both need to be 0.
+        connect_args = {
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        }
+    return create_async_engine(
+        url,
+        echo=False,
+        poolclass=_timed_pool(stats),
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args=connect_args,
+    )
+
+
+engine_stats = {"primary": PoolStats()}
+engine = _create_engine(settings.DATABASE_URL, engine_stats["primary"])
+
+# Reads that tolerate replication lag (analytics, exports, redirect lookups)
+# go to the replica when one is configured; everything else uses the primary.
+if settings.DATABASE_REPLICA_URL:
+    engine_stats["replica"] = PoolStats()
+    read_engine = _create_engine(settings.DATABASE_REPLICA_URL, engine_stats["replica"])
+else:
+    read_engine = engine
 
 AsyncSessionLocal = async_sessionmaker(
     engine, expire_on_commit=False
 )
 
+ReadSessionLocal = async_sessionmaker(
+    read_engine, expire_on_commit=False
+)
+
 class Base(DeclarativeBase):
     pass
 
 async def get_db():
     async with AsyncSessionLocal() as session:
         yield session
+
+if read_engine is engine:
+    # Without a replica, share the request's primary session (FastAPI caches
+    # dependencies per request) rather than checking out a second connection.
+    get_read_db = get_db
+else:
+    async def get_read_db():
+        async with ReadSessionLocal() as session:
+            yield session
+
+
+def pool_stats() -> dict[str, dict]:
+    """Checkout timings and current saturation for each engine's pool."""
+    engines = {"primary": engine}
+    if read_engine is not engine:
+        engines["replica"] = read_engine
+
+    stats = {}
+    for name, eng in engines.items():
+        pool = eng.pool
+        timings = engine_stats[name]
+        capacity = settings.DB_POOL_SIZE + max(settings.DB_MAX_OVERFLOW, 0)
+        stats[name] = {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "capacity": capacity,
+            "saturation": pool.checkedout() / capacity if capacity else 0.0,
+            "checkouts": timings.checkouts,
+            "checkout_seconds_total": timings.checkout_seconds_total,
+            "checkout_seconds_max": timings.checkout_seconds_max,
+            "timeouts": timings.timeouts,
+        }
+    return stats
@@ -0,0 +1,214 @@
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Series:
+    __slots__ = ("buckets", "counts", "total")
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last slot is +Inf
+        self.total = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+
+
+class Histogram:
+    """
+    Prometheus-style histogram. Observations only bump one bucket count;
+    cumulative bucket totals are computed when rendering. Hot paths can hold
+    on to labels(...) and observe on it directly, skipping the series lookup.
+    """
+
+    def __init__(self, name: str, description: str, buckets: tuple[float, ...], label_names: tuple[str, ...] = ()):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(sorted(buckets))
+        self.label_names = label_names
+        self._series: dict[tuple, _Series] = {}
+
+    def labels(self, *values) -> _Series:
+        series = self._series.get(values)
+        if series is None:
+            series = self._series[values] = _Series(self.buckets)
+        return series
+
+    def observe(self, value: float, labels: tuple = ()):
+        self.labels(*labels).observe(value)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        bounds = [_format_number(b) for b in self.buckets] + ["+Inf"]
+        for labels, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(bounds, series.counts):
+                cumulative += count
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {series.total!r}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {cumulative}")
+        return lines
+
+
+def render_gauges(name: str, description: str, samples: dict[tuple, float], label_names: tuple[str, ...] = (), kind: str = "gauge") -> list[str]:
+    """Render already-collected values (e.g. from a service's stats()) as one metric family."""
+    lines = [f"# HELP {name} {description}", f"# TYPE {name} {kind}"]
+    for labels, value in samples.items():
+        lines.append(f"{name}{_labels(label_names, labels)} {_format_number(value)}")
+    return lines
+
+
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+REDIRECT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0, 5.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+request_duration = Histogram(
+    "http_request_duration_seconds",
+    "Time to fully serve a request, by route template.",
+    HTTP_BUCKETS,
+    ("method", "route", "status"),
+)
+redirect_duration = Histogram(
+    "redirect_duration_seconds",
+    "Time to serve a short-link redirect (including queueing the click).",
+    REDIRECT_BUCKETS,
+    ("status",),
+)
+query_duration = Histogram(
+    "db_query_duration_seconds",
+    "Time spent executing each SQL statement.",
+    QUERY_BUCKETS,
+    ("engine",),
+)
+request_queries = Histogram(
+    "http_request_db_queries",
+    "SQL statements executed while serving one request.",
+    QUERY_COUNT_BUCKETS,
+    ("route",),
+)
+request_query_time = Histogram(
+    "http_request_db_seconds",
+    "Total SQL execution time while serving one request.",
+    QUERY_BUCKETS,
+    ("route",),
+)
+
+
+class _InFlight:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+
+requests_in_flight = _InFlight()
+
+
+class _QueryTally:
+    __slots__ = ("count", "seconds")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+
+_current_tally: ContextVar[_QueryTally | None] = ContextVar("metrics_query_tally", default=None)
+
+
+def instrument_engine(engine: AsyncEngine, name: str):
+    """Time every statement run on engine and attribute it to the current request, if any."""
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["metrics_query_start"].pop()
+        query_duration.observe(elapsed, (name,))
+        tally = _current_tally.get()
+        if tally is not None:
+            tally.count += 1
+            tally.seconds += elapsed
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware (no BaseHTTPMiddleware task/stream overhead) that
+    times each HTTP request end to end and tracks how many are in flight.
+
+    Requests are labelled by route template rather than path so cardinality
+    stays bounded. The redirect endpoint gets its own histogram with finer
+    buckets, and its series are looked up once up front so the per-request
+    cost stays at a few bucket increments.
+    """
+
+    def __init__(self, app, redirect_endpoint=None):
+        self.app = app
+        self.redirect_endpoint = redirect_endpoint
+        self._redirect_queries = request_queries.labels("redirect")
+        self._redirect_query_time = request_query_time.labels("redirect")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        tally = _QueryTally()
+        token = _current_tally.set(tally)
+        requests_in_flight.value += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            requests_in_flight.value -= 1
+            _current_tally.reset(token)
+            if scope.get("endpoint") is self.redirect_endpoint and self.redirect_endpoint is not None:
+                redirect_duration.labels(status).observe(elapsed)
+                self._redirect_queries.observe(tally.count)
+                self._redirect_query_time.observe(tally.seconds)
+            else:
+                route = _route_label(scope)
+                request_duration.labels(scope["method"], route, status).observe(elapsed)
+                request_queries.labels(route).observe(tally.count)
+                request_query_time.labels(route).observe(tally.seconds)
+
+
+def _route_label(scope) -> str:
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    endpoint = scope.get("endpoint")
+    if endpoint is not None:
+        return getattr(endpoint, "__name__", "other")
+    return "unmatched"
@@ -0,0 +1,27 @@
+from redis.asyncio import ConnectionPool, Redis
+from core.config import settings
+
+_client: Redis | None = None
+
+
+def get_redis() -> Redis | None:
+    """
+    Return the shared, pooled Redis client, or None when REDIS_URL is unset.
+    The pool is created on first use; no connection is opened until a command runs.
+    """
+    global _client
+    if _client is None and settings.REDIS_URL:
+        pool = ConnectionPool.from_url(
+            settings.REDIS_URL,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            decode_responses=True,
+        )
+        _client = Redis(connection_pool=pool)
+    return _client
+
+
+async def close_redis() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -1,13 +1,23 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 import bcrypt
-from jose import jwt, JWTError, ExpiredSignatureError
+from jose.exceptions import JWTError, ExpiredSignatureError
 from fastapi import HTTPException, status
 from core.config import settings
 
 
+def _jwt():
+    # jose.jwt loads the cryptography backend (~50 ms), which the redirect
+    # path never needs; it is imported on the first token operation instead.
+    from jose import jwt
+    return jwt
+
+
 def verify_token(token: str) -> dict:
     try:
-        payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
+        payload = _jwt().decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
         return payload
     except ExpiredSignatureError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token has expired")
@@ -28,13 +38,84 @@ def verify_password(password: str, hashed: str) -> bool:
     return bcrypt.checkpw(password_bytes, hashed_bytes)
 
 
+class PasswordHasher:
+    """
+    Runs bcrypt off the event loop on a bounded thread or process pool, so
+    logins and registrations do not stall redirects served by the same worker.
+    Callers beyond the pool size wait on a semaphore; that wait is recorded as
+    queue time.
+    """
+
+    def __init__(self, max_workers: int, executor_kind: str = "thread"):
+        if executor_kind not in ("thread", "process"):
+            raise ValueError("executor_kind must be 'thread' or 'process'")
+        self.max_workers = max_workers
+        self.executor_kind = executor_kind
+        self._executor: Executor | None = None
+        self._semaphore = asyncio.Semaphore(max_workers)
+        self.calls = 0
+        self.waiting = 0
+        self.queue_seconds_total = 0.0
+        self.queue_seconds_max = 0.0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    async def _run(self, func, *args):
+        queued_at = time.perf_counter()
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+        try:
+            waited = time.perf_counter() - queued_at
+            self.calls += 1
+            self.queue_seconds_total += waited
+            self.queue_seconds_max = max(self.queue_seconds_max, waited)
+            return await asyncio.get_running_loop().run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self._semaphore.release()
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        return await self._run(verify_password, password, hashed)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "calls": self.calls,
+            "waiting": self.waiting,
+            "queue_seconds_total": self.queue_seconds_total,
+            "queue_seconds_max": self.queue_seconds_max,
+        }
+
+
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    executor_kind=settings.PASSWORD_HASH_EXECUTOR,
+)
+
+
 def create_access_token(user_id: str):
     payload = {
         "sub": user_id,
         "type": "access",
         "exp": datetime.now(timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
     }
-    return jwt.encode(payload, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
+    return _jwt().encode(payload, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
 
 
 def create_refresh_token(user_id: str):
@@ -43,4 +124,4 @@ def create_refresh_token(user_id: str):
         "type": "refresh",
         "exp": datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
     }
-    return jwt.encode(payload, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
\ No newline at end of file
+    return _jwt().encode(payload, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
\ No newline at end of file
@@ -0,0 +1,103 @@
+import logging
+import math
+import socket
+import maxminddb
+from core.config import settings
+from core.utils.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# Cached lookups cover a whole /24 (IPv4) or /48 (IPv6), which is as fine as
+# country data ever gets in practice.
+IPV4_PREFIX = 24
+IPV6_PREFIX = 48
+
+# Cached for prefixes the database splits more finely than the ones above;
+# those addresses are looked up individually.
+_SPLIT = object()
+
+
+def _prefix_key(ip_address: str) -> str | bytes:
+    if ":" not in ip_address:
+        return ip_address.rpartition(".")[0]
+    return socket.inet_pton(socket.AF_INET6, ip_address)[:IPV6_PREFIX // 8]
+
+
+def _country_code(record) -> str:
+    if not record:
+        return ""
+    country = record.get("country") or record.get("registered_country") or {}
+    return country.get("iso_code", "")
+
+
+class GeoIPLookup:
+    """
+    IP address -> ISO 3166-1 alpha-2 country code, from a MaxMind-format
+    .mmdb file (GeoLite2/GeoIP2 Country or City, DB-IP, ...).
+
+    The file is memory-mapped (MODE_AUTO uses the C extension over mmap when
+    it is installed), so every worker on a host shares the same page cache
+    instead of loading its own copy. Results are cached per network prefix,
+    so a repeat visitor, or their neighbour, costs one dict lookup.
+    Without a database every address resolves to None.
+    """
+
+    def __init__(self, path: str | None, cache: LRUCache):
+        self.path = path
+        self.cache = cache
+        self._reader: maxminddb.Reader | None = None
+        self._failed = False
+
+    def _open(self) -> maxminddb.Reader | None:
+        if self._reader is None and self.path and not self._failed:
+            try:
+                self._reader = maxminddb.open_database(self.path, maxminddb.MODE_AUTO)
+            except (OSError, maxminddb.InvalidDatabaseError):
+                self._failed = True
+                logger.exception("Could not open GeoIP database %s; clicks will have no country", self.path)
+        return self._reader
+
+    def country(self, ip_address: str | None) -> str | None:
+        if not ip_address or not self.path:
+            return None
+        try:
+            key = _prefix_key(ip_address)
+        except OSError:
+            return None
+
+        cached = self.cache.get(key)
+        if cached is _SPLIT:
+            return self._lookup(ip_address)[0] or None
+        if cached is not None:
+            return cached or None
+
+        code, prefix_len = self._lookup(ip_address)
+        if prefix_len is not None:
+            covers_key = prefix_len <= (IPV6_PREFIX if isinstance(key, bytes) else IPV4_PREFIX)
+            self.cache.set(key, code if covers_key else _SPLIT)
+        return code or None
+
+    def _lookup(self, ip_address: str) -> tuple[str, int | None]:
+        reader = self._open()
+        if reader is None:
+            return "", None
+        try:
+            record, prefix_len = reader.get_with_prefix_len(ip_address)
+        except ValueError:
+            return "", None
+        return _country_code(record), prefix_len
+
+    def close(self) -> None:
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+        self.cache.clear()
+
+    def stats(self) -> dict[str, int]:
+        return self.cache.stats()
+
+
+geoip = GeoIPLookup(
+    settings.GEOIP_DATABASE_PATH,
+    LRUCache(max_entries=settings.GEOIP_CACHE_MAX_ENTRIES, ttl_seconds=math.inf),
+)
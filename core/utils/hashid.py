@@ -1,8 +1,130 @@
+import re
 from hashids import Hashids
 from fastapi import HTTPException
 from core.config import settings 
 
-hashids = Hashids(salt=settings.HASHID_SALT, min_length=8)
+
+def _reorder(string: str, salt: str) -> str:
+    """The hashids consistent shuffle."""
+    if not salt:
+        return string
+    chars = list(string)
+    index, integer_sum = 0, 0
+    for i in range(len(chars) - 1, 0, -1):
+        integer = ord(salt[index])
+        integer_sum += integer
+        j = (integer + index + integer_sum) % i
+        chars[i], chars[j] = chars[j], chars[i]
+        index = (index + 1) % len(salt)
+    return "".join(chars)
+
+
+class FastHashids:
+    """
+    Table-driven codec for single integers, producing exactly the same codes
+    as hashids.Hashids.
+
+    With one number, hashids shuffles the alphabet once, salted only by the
+    "lottery" character (alphabet[n % 100 % len(alphabet)]). There are just
+    len(alphabet) such shuffles, so they are computed up front together with
+    their character -> position maps. Encoding becomes a base conversion and
+    decoding a dict lookup per character. Codes holding several numbers are
+    never issued here and are handed to the reference implementation.
+    """
+
+    def __init__(self, salt: str = "", min_length: int = 0, alphabet: str = Hashids.ALPHABET):
+        # Reuse the reference constructor so alphabet/separator/guard derivation
+        # can never diverge from the library.
+        self._reference = Hashids(salt=salt, min_length=min_length, alphabet=alphabet)
+        self._min_length = self._reference._min_length
+        self._alphabet = self._reference._alphabet
+        self._separators = frozenset(self._reference._separators)
+        self._guards = self._reference._guards
+        self._guard_split = re.compile(f"[{re.escape(self._guards)}]")
+        self._lottery_index = {char: i for i, char in enumerate(self._alphabet)}
+
+        size = len(self._alphabet)
+        self._tables = [
+            _reorder(self._alphabet, (lottery + salt + self._alphabet)[:size])
+            for lottery in self._alphabet
+        ]
+        self._positions = [{char: i for i, char in enumerate(table)} for table in self._tables]
+        # Successive self-salted shuffles used to pad short codes, per lottery.
+        self._padding: list[list[str]] = [[] for _ in self._alphabet]
+
+    def _pad_alphabet(self, lottery_index: int, step: int) -> str:
+        chain = self._padding[lottery_index]
+        while len(chain) <= step:
+            previous = chain[-1] if chain else self._tables[lottery_index]
+            chain.append(_reorder(previous, previous))
+        return chain[step]
+
+    def encode(self, number: int) -> str:
+        if not isinstance(number, int) or number < 0:
+            return ""
+
+        size = len(self._alphabet)
+        values_hash = number % 100
+        lottery_index = values_hash % size
+        table = self._tables[lottery_index]
+
+        digits = []
+        while True:
+            number, remainder = divmod(number, size)
+            digits.append(table[remainder])
+            if not number:
+                break
+        encoded = self._alphabet[lottery_index] + "".join(reversed(digits))
+
+        if len(encoded) >= self._min_length:
+            return encoded
+
+        guards = self._guards
+        encoded = guards[(values_hash + ord(encoded[0])) % len(guards)] + encoded
+        if len(encoded) < self._min_length:
+            encoded += guards[(values_hash + ord(encoded[2])) % len(guards)]
+
+        split_at = size // 2
+        step = 0
+        while len(encoded) < self._min_length:
+            alphabet = self._pad_alphabet(lottery_index, step)
+            step += 1
+            encoded = alphabet[split_at:] + encoded + alphabet[:split_at]
+            excess = len(encoded) - self._min_length
+            if excess > 0:
+                start = excess // 2
+                encoded = encoded[start:start + self._min_length]
+        return encoded
+
+    def decode(self, hashid: str) -> tuple[int, ...]:
+        if not hashid or not isinstance(hashid, str):
+            return ()
+
+        parts = self._guard_split.split(hashid)
+        core = parts[1] if 2 <= len(parts) <= 3 else parts[0]
+        if not core:
+            return ()
+        if not self._separators.isdisjoint(core):
+            return self._reference.decode(hashid)
+
+        lottery_index = self._lottery_index.get(core[0])
+        if lottery_index is None:
+            return ()
+
+        positions = self._positions[lottery_index]
+        size = len(self._alphabet)
+        number = 0
+        for char in core[1:]:
+            position = positions.get(char)
+            if position is None:
+                return ()
+            number = number * size + position
+
+        # Same canonical-form check as hashids: reject anything we would not emit.
+        return (number,) if self.encode(number) == hashid else ()
+
+
+hashids = FastHashids(salt=settings.HASHID_SALT, min_length=8)
 
 class HashID:
     @staticmethod
@@ -0,0 +1,54 @@
+import base64
+import binascii
+import struct
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple
+from fastapi import HTTPException
+from sqlalchemy import Select, tuple_
+from core.utils.hashid import hashids
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_TIMESTAMP = struct.Struct(">q")
+
+
+class Cursor(NamedTuple):
+    """Position of the last row on a page, ordered by (created_at, id) descending."""
+    created_at: datetime
+    id: int
+
+
+def encode_cursor(created_at: datetime, id: int) -> str:
+    """
+    Opaque page cursor: the row's created_at in microseconds followed by its
+    hashid, so raw database ids are never exposed.
+    """
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    micros = (created_at - _EPOCH) // timedelta(microseconds=1)
+    raw = _TIMESTAMP.pack(micros) + hashids.encode(id).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        (micros,) = _TIMESTAMP.unpack_from(raw)
+        decoded = hashids.decode(raw[_TIMESTAMP.size:].decode())
+        created_at = _EPOCH + timedelta(microseconds=micros)
+    except (binascii.Error, struct.error, UnicodeDecodeError, ValueError, OverflowError):
+        decoded = ()
+    if len(decoded) != 1:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return Cursor(created_at, decoded[0])
+
+
+def keyset_page(query: Select, created_at_column, id_column, cursor: str | None, limit: int | None) -> Select:
+    """
+    Newest-first page of query after cursor. The row-value comparison lets
+    Postgres seek straight to the cursor on an index ending in
+    (created_at, id) instead of scanning and discarding earlier pages.
+    """
+    if cursor:
+        after = decode_cursor(cursor)
+        query = query.where(tuple_(created_at_column, id_column) < tuple_(after.created_at, after.id))
+    return query.order_by(created_at_column.desc(), id_column.desc()).limit(limit)
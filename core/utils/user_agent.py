@@ -0,0 +1,98 @@
+from enum import IntEnum
+from functools import lru_cache
+from typing import NamedTuple
+from core.config import settings
+
+# Longer user agents are classified on this prefix, which bounds cache memory.
+MAX_USER_AGENT_LENGTH = 512
+
+
+class Device(IntEnum):
+    UNKNOWN = 0
+    DESKTOP = 1
+    MOBILE = 2
+    TABLET = 3
+
+
+class Browser(IntEnum):
+    UNKNOWN = 0
+    CHROME = 1
+    SAFARI = 2
+    FIREFOX = 3
+    EDGE = 4
+    OPERA = 5
+    SAMSUNG = 6
+    IE = 7
+
+
+class UserAgentInfo(NamedTuple):
+    device: Device
+    browser: Browser
+    is_bot: bool
+
+
+# Crawler tokens rather than bare words: "bot" alone also matches phone
+# models such as CUBOT, and "monitor" or "preview" can appear in real
+# browsers' user agents. Crawlers name themselves "<name>bot/<version>",
+# usually inside "(compatible; ...; +http://...)".
+BOT_MARKERS = (
+    "bot/", "bot;", "bot)", "bot-", "bot (", "+http", "crawler", "spider", "slurp", "scrapy",
+    "headlesschrome", "phantomjs", "lighthouse", "facebookexternalhit", "embedly", "whatsapp/",
+    "bingpreview", "skypeuripreview", "google-pagerenderer", "pingdom", "uptimerobot", "statuscake",
+    "site24x7", "curl/", "wget/", "python-requests", "python-httpx", "python-urllib", "aiohttp",
+    "go-http-client", "java/", "okhttp", "libwww", "httpclient", "axios", "node-fetch",
+)
+TABLET_MARKERS = ("ipad", "tablet", "kindle", "silk/", "playbook")
+MOBILE_MARKERS = ("mobi", "iphone", "ipod", "android", "blackberry", "opera mini", "windows phone")
+DESKTOP_MARKERS = ("windows nt", "macintosh", "x11", "cros", "linux")
+# Checked in order: most browsers also claim to be Chrome and/or Safari.
+BROWSER_MARKERS = (
+    (Browser.EDGE, ("edg/", "edge/", "edga/", "edgios/")),
+    (Browser.OPERA, ("opr/", "opera")),
+    (Browser.SAMSUNG, ("samsungbrowser/",)),
+    (Browser.FIREFOX, ("firefox/", "fxios/")),
+    (Browser.CHROME, ("chrome/", "crios/", "chromium/")),
+    (Browser.SAFARI, ("safari/",)),
+    (Browser.IE, ("msie ", "trident/")),
+)
+
+UNKNOWN = UserAgentInfo(Device.UNKNOWN, Browser.UNKNOWN, False)
+
+
+def _device(ua: str) -> Device:
+    if any(marker in ua for marker in TABLET_MARKERS) or ("android" in ua and "mobile" not in ua):
+        return Device.TABLET
+    if any(marker in ua for marker in MOBILE_MARKERS):
+        return Device.MOBILE
+    if any(marker in ua for marker in DESKTOP_MARKERS):
+        return Device.DESKTOP
+    return Device.UNKNOWN
+
+
+def _browser(ua: str) -> Browser:
+    for browser, markers in BROWSER_MARKERS:
+        if any(marker in ua for marker in markers):
+            return browser
+    return Browser.UNKNOWN
+
+
+@lru_cache(maxsize=settings.USER_AGENT_CACHE_MAX_ENTRIES)
+def _classify(ua: str) -> UserAgentInfo:
+    ua = ua.lower()
+    return UserAgentInfo(_device(ua), _browser(ua), any(marker in ua for marker in BOT_MARKERS))
+
+
+def classify_user_agent(user_agent: str | None) -> UserAgentInfo:
+    """
+    Device, browser and bot flag for a user agent string. Substring checks
+    are cheap, but real traffic repeats a small set of user agents, so
+    results are memoized in an LRU (see cache_stats()).
+    """
+    if not user_agent:
+        return UNKNOWN
+    return _classify(user_agent[:MAX_USER_AGENT_LENGTH])
+
+
+def cache_stats() -> dict[str, int]:
+    info = _classify.cache_info()
+    return {"size": info.currsize, "max_entries": info.maxsize, "hits": info.hits, "misses": info.misses}
@@ -1,5 +1,7 @@
 import gzip
+import mmap
 import re
+import struct
 from functools import lru_cache
 from pathlib import Path
 
@@ -9,6 +11,15 @@ COMMON_PASSWORDS_FILE = (
     Path(__file__).parent / "common-passwords.txt.gz"
 )
 
+# Prebuilt from COMMON_PASSWORDS_FILE by `python -m scripts.build_password_index`.
+COMMON_PASSWORDS_INDEX = (
+    Path(__file__).parent / "common-passwords.idx"
+)
+
+# magic, record width, record count; followed by the sorted, NUL-padded records
+INDEX_HEADER = struct.Struct("<8sII")
+INDEX_MAGIC = b"CPWIDX01"
+
 # Regex rules
 UPPERCASE_REGEX = re.compile(r"[A-Z]")
 LOWERCASE_REGEX = re.compile(r"[a-z]")
@@ -16,12 +27,8 @@ DIGIT_REGEX = re.compile(r"\d")
 SPECIAL_CHAR_REGEX = re.compile(r"[^\w\s]")  # symbols only
 
 
-@lru_cache(maxsize=1)
-def load_common_passwords() -> set[str]:
-    """
-    Load and cache common passwords from gz file.
-    Cached in memory after first load.
-    """
+def read_common_passwords() -> set[str]:
+    """Read the lower-cased common passwords from the gz source list."""
     passwords: set[str] = set()
 
     with gzip.open(COMMON_PASSWORDS_FILE, "rt", encoding="utf-8") as f:
@@ -33,6 +40,69 @@ def load_common_passwords() -> set[str]:
     return passwords
 
 
+def build_common_password_index(destination: Path = COMMON_PASSWORDS_INDEX) -> int:
+    """Write the sorted fixed-width index used by CommonPasswordIndex."""
+    records = sorted(p.encode("utf-8") for p in read_common_passwords())
+    width = max(len(r) for r in records)
+
+    with open(destination, "wb") as f:
+        f.write(INDEX_HEADER.pack(INDEX_MAGIC, width, len(records)))
+        for record in records:
+            f.write(record.ljust(width, b"\0"))
+
+    return len(records)
+
+
+class CommonPasswordIndex:
+    """
+    Membership test over the prebuilt index via binary search on a read-only
+    mmap. The pages live in the OS page cache, so every worker shares one copy
+    and nothing is parsed at startup.
+    """
+
+    def __init__(self, path: Path = COMMON_PASSWORDS_INDEX):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self.width, self.count = INDEX_HEADER.unpack_from(self._mm)
+        if magic != INDEX_MAGIC:
+            raise ValueError(f"{path} is not a common password index")
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, password: str) -> bool:
+        key = password.encode("utf-8")
+        if len(key) > self.width:
+            return False
+        key = key.ljust(self.width, b"\0")
+
+        mm, width, offset = self._mm, self.width, INDEX_HEADER.size
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = offset + mid * width
+            record = mm[start:start + width]
+            if record < key:
+                lo = mid + 1
+            elif record > key:
+                hi = mid
+            else:
+                return True
+        return False
+
+
+@lru_cache(maxsize=1)
+def load_common_passwords() -> CommonPasswordIndex | set[str]:
+    """
+    Open the shared common password index, falling back to reading the gz
+    list into memory if the index has not been built.
+    """
+    if COMMON_PASSWORDS_INDEX.exists():
+        return CommonPasswordIndex()
+    return read_common_passwords()
+
+
 class PasswordValidator:
     @staticmethod
     def validate(value: str) -> str:
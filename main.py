@@ -1,15 +1,49 @@
-from fastapi import FastAPI, Request, BackgroundTasks, Depends
-from fastapi.responses import RedirectResponse
-from sqlalchemy.ext.asyncio import AsyncSession
-from core.database import get_db
+import asyncio
+from contextlib import asynccontextmanager, suppress
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import PlainTextResponse, RedirectResponse
+from starlette.background import BackgroundTask
+from core.database import engine, read_engine
+from core.metrics import MetricsMiddleware, instrument_engine
+from core.redis_client import close_redis
+from core.security import password_hasher
+from core.utils.geoip import geoip
+from core.utils.hashid import HashID
+from services.click_ingest import click_ingestor
+from services.event_partitions import maintain_link_event_partitions
 from services.link_redirect import LinkRedirectService
+from services.metrics import render_metrics
+from services.rate_limit import rate_limiter, retry_after
+from services.warmup import preload_lazy_modules, warm_up
 from api.v1 import router as v1_router
 from core.config import settings
 from fastapi.middleware.cors import CORSMiddleware
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    partitions = asyncio.create_task(maintain_link_event_partitions(
+        settings.EVENT_PARTITION_MONTHS_AHEAD,
+        settings.EVENT_PARTITION_CHECK_INTERVAL_SECONDS,
+    ))
+    compaction = asyncio.create_task(rate_limiter.compact_forever(settings.RATE_LIMIT_COMPACT_INTERVAL_SECONDS))
+    await click_ingestor.start()
+    await warm_up()
+    # Off the startup path: the worker serves while the AI SDK and JWT backend load.
+    preload = asyncio.create_task(asyncio.to_thread(preload_lazy_modules))
+    yield
+    # Flush buffered clicks before the worker exits.
+    await click_ingestor.stop()
+    for task in (partitions, compaction, preload):
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    await close_redis()
+    password_hasher.shutdown()
+    geoip.close()
 
-app = FastAPI()
+
+app = FastAPI(lifespan=lifespan)
 
 origins = [
     "http://localhost:5173",
@@ -22,39 +56,48 @@ app.add_middleware(
     allow_headers=["*"],          # allow all headers
 )
 
-async def record_click_background(
-    public_id: str,
-    ip_address: str | None,
-    user_agent: str | None,
-    source: str | None,
-    db: AsyncSession
-):
-    service = LinkRedirectService(db)
-    link = await service.get_link_by_public_id(public_id)
-    await service.record_click(link, ip_address, user_agent, source)
-
-
-@app.get("/{public_id}", include_in_schema=False)
-async def redirect_link(
-    public_id: str,
-    request: Request,
-    background_tasks: BackgroundTasks,
-    db: AsyncSession = Depends(get_db)
-):
-
-    background_tasks.add_task(
-        record_click_background,
-        public_id=public_id,
-        ip_address=request.client.host, #type: ignore
+
+async def redirect_link(request: Request) -> RedirectResponse:
+    """
+    Redirect hot path. Registered as a plain route so it skips FastAPI's
+    dependency resolution and request validation; a DB session is only
+    opened when the link is not cached.
+
+    Clients over the rate limit are either still redirected without their
+    click being recorded, or refused with 429 (RATE_LIMIT_POLICY).
+    """
+    link_id = HashID.decode(request.path_params["public_id"])
+    ip_address = request.client.host if request.client else None
+
+    wait = await rate_limiter.check(ip_address, link_id)
+    if wait and rate_limiter.reject:
+        raise HTTPException(status_code=429, detail="Too many requests", headers={"Retry-After": retry_after(wait)})
+
+    url = await LinkRedirectService().get_url(link_id)
+    if wait:
+        return RedirectResponse(url=url, status_code=settings.REDIRECT_STATUS_CODE)
+
+    click = BackgroundTask(
+        click_ingestor.record,
+        link_id,
+        ip_address=ip_address,
         user_agent=request.headers.get("user-agent"),
-        source=request.query_params.get("utm_source"),
-        db=db
+        source=request.query_params.get("utm_source")
     )
+    return RedirectResponse(url=url, status_code=settings.REDIRECT_STATUS_CODE, background=click)
+
+
+async def metrics_endpoint(request: Request) -> PlainTextResponse:
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
 
-    service = LinkRedirectService(db)
-    link = await service.get_link_by_public_id(public_id)
 
-    return RedirectResponse(url=link.url, status_code=settings.REDIRECT_STATUS_CODE)
+instrument_engine(engine, "primary")
+if read_engine is not engine:
+    instrument_engine(read_engine, "replica")
+app.add_middleware(MetricsMiddleware, redirect_endpoint=redirect_link)
 
+# Must come before the catch-all redirect route.
+app.add_route("/metrics", metrics_endpoint, methods=["GET"], include_in_schema=False)
+app.add_route("/{public_id}", redirect_link, methods=["GET"], include_in_schema=False)
 
-app.include_router(v1_router)
\ No newline at end of file
+app.include_router(v1_router)
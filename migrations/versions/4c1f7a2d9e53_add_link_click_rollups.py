@@ -0,0 +1,36 @@
+"""Add link_click_rollups for pre-aggregated click analytics
+
+Revision ID: 4c1f7a2d9e53
+Revises: 9b29de19f6f6
+Create Date: 2026-10-18 09:12:44.201837
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4c1f7a2d9e53'
+down_revision: Union[str, Sequence[str], None] = '9b29de19f6f6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('link_click_rollups',
+    sa.Column('link_id', sa.Integer(), nullable=False),
+    sa.Column('bucket', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('source', sa.String(length=512), nullable=False),
+    sa.Column('clicks', sa.BigInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['link_id'], ['links.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('link_id', 'bucket', 'source')
+    )
+    # Existing clicks are loaded with `python -m scripts.backfill_rollups`.
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('link_click_rollups')
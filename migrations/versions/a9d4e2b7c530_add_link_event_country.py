@@ -0,0 +1,38 @@
+"""Add link_events.country and link_country_rollups
+
+Revision ID: a9d4e2b7c530
+Revises: f3a7c1d92e64
+Create Date: 2026-10-18 19:05:37.412980
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9d4e2b7c530'
+down_revision: Union[str, Sequence[str], None] = 'f3a7c1d92e64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('link_events', sa.Column('country', sa.String(length=2), nullable=True))
+    op.create_table('link_country_rollups',
+    sa.Column('link_id', sa.Integer(), nullable=False),
+    sa.Column('bucket', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('country', sa.String(length=2), nullable=False),
+    sa.Column('clicks', sa.BigInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['link_id'], ['links.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('link_id', 'bucket', 'country')
+    )
+    # Existing clicks are geolocated with `python -m scripts.backfill_rollups`.
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('link_country_rollups')
+    op.drop_column('link_events', 'country')
@@ -0,0 +1,103 @@
+"""Partition link_events by month on clicked_at and add analytics indexes
+
+Revision ID: b7e2d5a01c8f
+Revises: 4c1f7a2d9e53
+Create Date: 2026-10-18 11:40:02.583196
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2d5a01c8f'
+down_revision: Union[str, Sequence[str], None] = '4c1f7a2d9e53'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Partitions created ahead of the current month; the app keeps extending this
+# window at runtime (services.event_partitions).
+MONTHS_AHEAD = 3
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("ALTER TABLE link_events RENAME TO link_events_unpartitioned")
+    op.execute("ALTER TABLE link_events_unpartitioned RENAME CONSTRAINT link_events_pkey TO link_events_unpartitioned_pkey")
+    op.execute("ALTER TABLE link_events_unpartitioned RENAME CONSTRAINT link_events_link_id_fkey TO link_events_unpartitioned_link_id_fkey")
+
+    op.execute("""
+        CREATE TABLE link_events (
+            id BIGINT NOT NULL DEFAULT nextval('link_events_id_seq'),
+            link_id INTEGER NOT NULL,
+            clicked_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            source VARCHAR(512),
+            ip_address VARCHAR(45),
+            user_agent TEXT,
+            CONSTRAINT link_events_pkey PRIMARY KEY (id, clicked_at),
+            CONSTRAINT link_events_link_id_fkey FOREIGN KEY (link_id) REFERENCES links (id)
+        ) PARTITION BY RANGE (clicked_at)
+    """)
+    # Keep the existing sequence (and ids) but move it to the new table before
+    # the old one, which owns it, is dropped.
+    op.execute("ALTER SEQUENCE link_events_id_seq AS BIGINT OWNED BY link_events.id")
+
+    op.create_index('ix_link_events_link_id_clicked_at', 'link_events', ['link_id', 'clicked_at'])
+    op.create_index('ix_link_events_link_id_source', 'link_events', ['link_id', 'source'])
+
+    # One partition per UTC month from the oldest existing click up to
+    # MONTHS_AHEAD months from now; anything outside falls into DEFAULT.
+    op.execute(f"""
+        DO $$
+        DECLARE
+            month timestamp := date_trunc('month', COALESCE(
+                (SELECT min(clicked_at) FROM link_events_unpartitioned), now()
+            ) AT TIME ZONE 'UTC');
+            last_month timestamp := date_trunc('month', now() AT TIME ZONE 'UTC') + interval '{MONTHS_AHEAD} months';
+        BEGIN
+            WHILE month <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF link_events FOR VALUES FROM (%L) TO (%L)',
+                    'link_events_p' || to_char(month, 'YYYY_MM'),
+                    month AT TIME ZONE 'UTC',
+                    (month + interval '1 month') AT TIME ZONE 'UTC'
+                );
+                month := month + interval '1 month';
+            END LOOP;
+        END $$
+    """)
+    op.execute("CREATE TABLE link_events_default PARTITION OF link_events DEFAULT")
+
+    op.execute("""
+        INSERT INTO link_events (id, link_id, clicked_at, source, ip_address, user_agent)
+        SELECT id, link_id, clicked_at, source, ip_address, user_agent FROM link_events_unpartitioned
+    """)
+    op.drop_table('link_events_unpartitioned')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("ALTER TABLE link_events RENAME TO link_events_partitioned")
+    op.execute("ALTER TABLE link_events_partitioned RENAME CONSTRAINT link_events_pkey TO link_events_partitioned_pkey")
+    op.execute("ALTER TABLE link_events_partitioned RENAME CONSTRAINT link_events_link_id_fkey TO link_events_partitioned_link_id_fkey")
+
+    op.create_table('link_events',
+    sa.Column('id', sa.Integer(), server_default=sa.text("nextval('link_events_id_seq')"), nullable=False),
+    sa.Column('link_id', sa.Integer(), nullable=False),
+    sa.Column('clicked_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('source', sa.String(length=512), nullable=True),
+    sa.Column('ip_address', sa.String(length=45), nullable=True),
+    sa.Column('user_agent', sa.Text(), nullable=True),
+    sa.ForeignKeyConstraint(['link_id'], ['links.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute("ALTER SEQUENCE link_events_id_seq AS INTEGER OWNED BY link_events.id")
+
+    op.execute("""
+        INSERT INTO link_events (id, link_id, clicked_at, source, ip_address, user_agent)
+        SELECT id, link_id, clicked_at, source, ip_address, user_agent FROM link_events_partitioned
+    """)
+    # Dropping the parent drops every partition with it.
+    op.drop_table('link_events_partitioned')
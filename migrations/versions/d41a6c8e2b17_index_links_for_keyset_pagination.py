@@ -0,0 +1,29 @@
+"""Index links on (user_id, created_at, id) for keyset pagination
+
+Revision ID: d41a6c8e2b17
+Revises: b7e2d5a01c8f
+Create Date: 2026-10-18 14:02:37.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41a6c8e2b17'
+down_revision: Union[str, Sequence[str], None] = 'b7e2d5a01c8f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_links_user_id_created_at_id', 'links', ['user_id', 'created_at', 'id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_links_user_id_created_at_id', table_name='links')
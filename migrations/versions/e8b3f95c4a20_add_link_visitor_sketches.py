@@ -0,0 +1,35 @@
+"""Add link_visitor_sketches for approximate unique visitors
+
+Revision ID: e8b3f95c4a20
+Revises: d41a6c8e2b17
+Create Date: 2026-10-18 16:25:48.904113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8b3f95c4a20'
+down_revision: Union[str, Sequence[str], None] = 'd41a6c8e2b17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('link_visitor_sketches',
+    sa.Column('link_id', sa.Integer(), nullable=False),
+    sa.Column('bucket', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('registers', sa.LargeBinary(), nullable=False),
+    sa.ForeignKeyConstraint(['link_id'], ['links.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('link_id', 'bucket')
+    )
+    # Existing clicks are loaded with `python -m scripts.backfill_rollups`.
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('link_visitor_sketches')
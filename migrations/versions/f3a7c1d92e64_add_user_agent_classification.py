@@ -0,0 +1,44 @@
+"""Classify click user agents and add link_agent_rollups
+
+Revision ID: f3a7c1d92e64
+Revises: e8b3f95c4a20
+Create Date: 2026-10-18 17:42:11.306518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a7c1d92e64'
+down_revision: Union[str, Sequence[str], None] = 'e8b3f95c4a20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('link_events', sa.Column('device', sa.SmallInteger(), server_default='0', nullable=False))
+    op.add_column('link_events', sa.Column('browser', sa.SmallInteger(), server_default='0', nullable=False))
+    op.add_column('link_events', sa.Column('is_bot', sa.Boolean(), server_default=sa.false(), nullable=False))
+    op.create_table('link_agent_rollups',
+    sa.Column('link_id', sa.Integer(), nullable=False),
+    sa.Column('bucket', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('device', sa.SmallInteger(), nullable=False),
+    sa.Column('browser', sa.SmallInteger(), nullable=False),
+    sa.Column('is_bot', sa.Boolean(), nullable=False),
+    sa.Column('clicks', sa.BigInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['link_id'], ['links.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('link_id', 'bucket', 'device', 'browser', 'is_bot')
+    )
+    # Existing clicks are classified with `python -m scripts.backfill_rollups`.
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('link_agent_rollups')
+    op.drop_column('link_events', 'is_bot')
+    op.drop_column('link_events', 'browser')
+    op.drop_column('link_events', 'device')
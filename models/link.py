@@ -1,4 +1,4 @@
-from sqlalchemy import Integer, String, ForeignKey, DateTime, Text
+from sqlalchemy import BigInteger, Boolean, Integer, SmallInteger, String, ForeignKey, DateTime, Text, Index, LargeBinary, false
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from core.database import Base
 from datetime import datetime, timezone
@@ -8,6 +8,10 @@ from core.utils.hashid import HashID
 
 class Link(Base):
     __tablename__ = "links"
+    __table_args__ = (
+        # Keyset pagination of a user's links, newest first (core.utils.pagination).
+        Index("ix_links_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
@@ -21,24 +25,91 @@ class Link(Base):
 
     user = relationship("User", back_populates="links")
     events = relationship("LinkEvent", back_populates="link", cascade="all, delete-orphan")
+    click_rollups = relationship("LinkClickRollup", cascade="all, delete-orphan", passive_deletes=True)
+    visitor_sketches = relationship("LinkVisitorSketch", cascade="all, delete-orphan", passive_deletes=True)
+    agent_rollups = relationship("LinkAgentRollup", cascade="all, delete-orphan", passive_deletes=True)
+    country_rollups = relationship("LinkCountryRollup", cascade="all, delete-orphan", passive_deletes=True)
+
+    # Not mapped; memoizes public_id per instance (ids never change once assigned).
+    _public_id = None
 
     @property
     def public_id(self) -> str:
-        return HashID.encode(self.id)
+        if not self._public_id:
+            self._public_id = HashID.encode(self.id)
+        return self._public_id
 
 class LinkEvent(Base):
+    """Raw click events, range-partitioned by month on clicked_at (see services.event_partitions)."""
     __tablename__ = "link_events"
+    __table_args__ = (
+        Index("ix_link_events_link_id_clicked_at", "link_id", "clicked_at"),
+        Index("ix_link_events_link_id_source", "link_id", "source"),
+        {"postgresql_partition_by": "RANGE (clicked_at)"},
+    )
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    # The partition key has to be part of the primary key.
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
     link_id: Mapped[int] = mapped_column(ForeignKey("links.id"), nullable=False)
     clicked_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
+        primary_key=True,
         default=lambda: datetime.now(timezone.utc),
         nullable=False
     )
     source: Mapped[str] = mapped_column(String(512), nullable=True)
     ip_address: Mapped[str] = mapped_column(String(45), nullable=True)
     user_agent: Mapped[str] = mapped_column(Text, nullable=True)
+    # core.utils.user_agent.Device / Browser values, classified at ingest.
+    device: Mapped[int] = mapped_column(SmallInteger, nullable=False, default=0, server_default="0")
+    browser: Mapped[int] = mapped_column(SmallInteger, nullable=False, default=0, server_default="0")
+    is_bot: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False, server_default=false())
+    # ISO 3166-1 alpha-2, resolved from ip_address at ingest when a GeoIP database is configured.
+    country: Mapped[str] = mapped_column(String(2), nullable=True)
+
+
+    link = relationship("Link", back_populates="events")
+
+
+class LinkClickRollup(Base):
+    """Click counts per link, UTC day and source, maintained as clicks are ingested."""
+    __tablename__ = "link_click_rollups"
+
+    link_id: Mapped[int] = mapped_column(ForeignKey("links.id", ondelete="CASCADE"), primary_key=True)
+    bucket: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    # "" stands in for clicks without a source so it can be part of the key.
+    source: Mapped[str] = mapped_column(String(512), primary_key=True, default="")
+    clicks: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+
+class LinkAgentRollup(Base):
+    """Click counts per link, UTC day, device, browser and bot flag, maintained as clicks are ingested."""
+    __tablename__ = "link_agent_rollups"
+
+    link_id: Mapped[int] = mapped_column(ForeignKey("links.id", ondelete="CASCADE"), primary_key=True)
+    bucket: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    device: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    browser: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    is_bot: Mapped[bool] = mapped_column(Boolean, primary_key=True)
+    clicks: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+
+class LinkCountryRollup(Base):
+    """Human click counts per link, UTC day and country, maintained as clicks are ingested."""
+    __tablename__ = "link_country_rollups"
+
+    link_id: Mapped[int] = mapped_column(ForeignKey("links.id", ondelete="CASCADE"), primary_key=True)
+    bucket: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    # "" stands in for clicks without a known country so it can be part of the key.
+    country: Mapped[str] = mapped_column(String(2), primary_key=True, default="")
+    clicks: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
 
+class LinkVisitorSketch(Base):
+    """HyperLogLog sketch (core.utils.hll) of distinct visitors per link and UTC day."""
+    __tablename__ = "link_visitor_sketches"
 
-    link = relationship("Link", back_populates="events")
\ No newline at end of file
+    link_id: Mapped[int] = mapped_column(ForeignKey("links.id", ondelete="CASCADE"), primary_key=True)
+    bucket: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    # Empty until the first merge; 4 KiB of registers after that.
+    registers: Mapped[bytes] = mapped_column(LargeBinary, nullable=False, default=b"")
@@ -20,6 +20,11 @@ class User(Base):
 
     links = relationship("Link", back_populates="user", cascade="all, delete-orphan")
 
+    # Not mapped; memoizes public_id per instance (ids never change once assigned).
+    _public_id = None
+
     @property
     def public_id(self) -> str:
-        return HashID.encode(self.id)
+        if not self._public_id:
+            self._public_id = HashID.encode(self.id)
+        return self._public_id
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 from pydantic import BaseModel, HttpUrl
 
 
@@ -13,13 +13,36 @@ class ClickBySource(BaseModel):
     clicks: int
 
 
+class ClickByDevice(BaseModel):
+    device: str
+    clicks: int
+
+
+class ClickByBrowser(BaseModel):
+    browser: str
+    clicks: int
+
+
+class ClickByCountry(BaseModel):
+    country: str
+    clicks: int
+
+
 class LinkAnalyticsResponse(BaseModel):
     url: HttpUrl
     shortended_url: HttpUrl
     total_clicks: int
+    # Approximate (HyperLogLog, ~1.6% standard error) distinct IP + user agent pairs.
+    unique_visitors: int
     clicks_per_day: List[ClickPerDay]
     clicks_by_source: List[ClickBySource]
+    clicks_by_device: List[ClickByDevice]
+    clicks_by_browser: List[ClickByBrowser]
+    clicks_by_country: List[ClickByCountry]
+    # Clicks from crawlers, link previews and HTTP libraries; not part of total_clicks.
+    bot_clicks: int
 
 
 class AllLinksAnalyticsResponse(BaseModel):
     links: List[LinkAnalyticsResponse]
+    next_cursor: Optional[str] = None
@@ -1,5 +1,6 @@
 from pydantic import BaseModel, HttpUrl
 from datetime import datetime
+from typing import List, Optional
 
 class LinkCreate(BaseModel):
     title: str
@@ -11,3 +12,7 @@ class LinkResponse(BaseModel):
     url: HttpUrl
     shortened_url: HttpUrl
     created_at: datetime
+
+class LinkListResponse(BaseModel):
+    links: List[LinkResponse]
+    next_cursor: Optional[str] = None
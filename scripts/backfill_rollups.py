@@ -0,0 +1,59 @@
+"""
+Classify stored clicks by user agent (and by country, when
+GEOIP_DATABASE_PATH is set), then rebuild link_click_rollups,
+link_agent_rollups, link_country_rollups and link_visitor_sketches from the
+raw link_events table. Bot clicks are left out of the click and country
+rollups and the visitor sketches.
+
+Run once after applying the rollup, sketch or user agent migrations, after
+the user agent markers change, or any time they are suspected to be out of
+sync. --since limits the rebuild to recent days:
+
+    python -m scripts.backfill_rollups
+    python -m scripts.backfill_rollups --since 2026-10-01
+"""
+import argparse
+import asyncio
+from datetime import datetime
+
+import models.base  # noqa: F401  (registers all mappers)
+from core.database import engine
+from core.utils.geoip import geoip
+from services.click_rollup import (
+    backfill_agent_rollups,
+    backfill_click_rollups,
+    backfill_country_rollups,
+    backfill_visitor_sketches,
+    classify_stored_events,
+    geolocate_stored_events,
+)
+
+
+async def main(since: datetime | None):
+    async with engine.begin() as conn:
+        user_agents = await classify_stored_events(conn, since)
+    print(f"Classified {user_agents} distinct user agents")
+    if geoip.path:
+        async with engine.begin() as conn:
+            addresses = await geolocate_stored_events(conn, geoip, since)
+        print(f"Geolocated {addresses} distinct IP addresses")
+    async with engine.begin() as conn:
+        rows = await backfill_click_rollups(conn, since)
+    print(f"Rebuilt {rows} rollup rows")
+    async with engine.begin() as conn:
+        agent_rows = await backfill_agent_rollups(conn, since)
+    print(f"Rebuilt {agent_rows} user agent rollup rows")
+    async with engine.begin() as conn:
+        country_rows = await backfill_country_rollups(conn, since)
+    print(f"Rebuilt {country_rows} country rollup rows")
+    async with engine.begin() as conn:
+        sketches = await backfill_visitor_sketches(conn, since)
+    print(f"Rebuilt {sketches} visitor sketches")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--since", type=datetime.fromisoformat, default=None)
+    args = parser.parse_args()
+    asyncio.run(main(args.since))
@@ -0,0 +1,13 @@
+"""
+Build core/validators/common-passwords.idx from common-passwords.txt.gz.
+
+Re-run and commit the result whenever the gz list changes:
+
+    python -m scripts.build_password_index
+"""
+from core.validators.password import COMMON_PASSWORDS_INDEX, build_common_password_index
+
+
+if __name__ == "__main__":
+    count = build_common_password_index()
+    print(f"Wrote {count} passwords to {COMMON_PASSWORDS_INDEX}")
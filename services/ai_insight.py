@@ -1,10 +1,44 @@
-from typing import List
-from google import genai
+import asyncio
+import logging
+import time
+from typing import TYPE_CHECKING, AsyncIterator, List, NamedTuple
 from fastapi import HTTPException
 from schemas.analytics import LinkAnalyticsResponse
 from core.config import settings
+from services.insight_cache import insight_cache, insight_cache_key
+from services.insight_summary import OMITTED_LINE_RESERVE, summarize_analytics
 
-client = genai.Client(api_key=settings.GEMINI_API_KEY)
+if TYPE_CHECKING:
+    from google import genai
+
+logger = logging.getLogger(__name__)
+
+_client: "genai.Client | None" = None
+
+
+def get_client() -> "genai.Client":
+    """
+    The shared Gemini client, created on first use. Importing the SDK takes
+    longer than the rest of the app's imports together, so it stays off the
+    startup path; the lifespan preloads it in a thread once the worker is up.
+    """
+    global _client
+    if _client is None:
+        from google import genai
+        from google.genai import types
+
+        _client = genai.Client(
+            api_key=settings.GEMINI_API_KEY,
+            # Point at a local fake model server in development and tests.
+            http_options=types.HttpOptions(base_url=settings.GEMINI_BASE_URL) if settings.GEMINI_BASE_URL else None,
+        )
+    return _client
+
+
+MODEL = "gemini-2.5-flash"
+
+# Caps concurrent LLM calls per worker; extra requests wait (within their timeout).
+_generation_slots = asyncio.Semaphore(settings.AI_INSIGHT_MAX_CONCURRENCY)
 BASE_PROMPT = """You are a data analyst assistant for a URL shortening platform.
 
 Your task is to analyze link performance data and generate clear, actionable insights
@@ -25,46 +59,115 @@ Guidelines:
 
 Focus on helping the user understand what is working, what is not, and what to do next.
 """
+ANALYTICS_HEADER = "\n\nHere is your analytics data:\n"
+
+
+class PreparedPrompt(NamedTuple):
+    text: str
+    cache_key: str
 
 
 class AIInsightService:
-    async def generate_insights(
+    def __init__(self, genai_client: "genai.Client | None" = None):
+        # Anything exposing `.aio.models` works, so tests can inject a stub.
+        self.client = genai_client or get_client()
+
+    def prepare_prompt(
         self,
         analytics: List[LinkAnalyticsResponse],
         user_prompt: str
-    ) -> str:
+    ) -> PreparedPrompt:
 
         if not user_prompt.strip():
             raise HTTPException(status_code=400, detail="Prompt cannot be empty.")
 
 
+        started = time.perf_counter()
+        final_prompt = BASE_PROMPT + "\n\nUser request:\n" + user_prompt
+
+        # Leave room for at least the "N links omitted" line, so the model is
+        # always told that analytics exist.
+        budget = settings.AI_PROMPT_MAX_CHARS - len(final_prompt) - len(ANALYTICS_HEADER)
+        if budget < OMITTED_LINE_RESERVE:
+            raise HTTPException(status_code=400, detail="Prompt is too long.")
+
         analytics_summary = ""
         if analytics:
-            for link in analytics:
-                per_day_text = ", ".join(
-                    f"{cp.day}: {cp.clicks} clicks" for cp in link.clicks_per_day
-                ) or "no daily clicks"
-                source_text = ", ".join(
-                    f"{src.source} ({src.clicks})" for src in link.clicks_by_source
-                ) or "no sources recorded"
-                analytics_summary += (
-                    f"Link {link.shortended_url} ({link.url}): "
-                    f"{link.total_clicks} total clicks; "
-                    f"daily breakdown: {per_day_text}; "
-                    f"sources: {source_text}.\n"
-                )
+            analytics_summary = summarize_analytics(analytics, max_chars=budget)
+        if analytics_summary:
+            final_prompt += ANALYTICS_HEADER + analytics_summary
 
+        logger.info(
+            "Built AI insight prompt: %d links, %d chars in %.2f ms",
+            len(analytics), len(final_prompt), (time.perf_counter() - started) * 1000
+        )
+        return PreparedPrompt(final_prompt, insight_cache_key(MODEL, user_prompt, analytics_summary))
 
-        final_prompt = BASE_PROMPT + "\n\nUser request:\n" + user_prompt
-        if analytics_summary:
-            final_prompt += "\n\nHere is your analytics data:\n" + analytics_summary
+    async def generate_insights(
+        self,
+        analytics: List[LinkAnalyticsResponse],
+        user_prompt: str
+    ) -> str:
+        prompt = self.prepare_prompt(analytics, user_prompt)
+
+        cached = await insight_cache.get(prompt.cache_key)
+        if cached is not None:
+            return cached
 
         try:
-            response = client.models.generate_content(
-                model="gemini-2.5-flash",
-                contents=final_prompt
-            )
-            return response.text  # type: ignore
+            async with asyncio.timeout(settings.AI_INSIGHT_TIMEOUT_SECONDS):
+                async with _generation_slots:
+                    response = await self.client.aio.models.generate_content(
+                        model=MODEL,
+                        contents=prompt.text
+                    )
 
+        except TimeoutError:
+            raise HTTPException(status_code=504, detail="Gemini generation timed out")
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Gemini generation failed: {str(e)}")
+
+        if response.text:
+            await insight_cache.set(prompt.cache_key, response.text)
+        return response.text  # type: ignore
+
+    async def stream_insights(self, prompt: PreparedPrompt) -> AsyncIterator[str]:
+        """
+        Yield response text as the model produces it. The prompt comes from
+        prepare_prompt, so validation errors surface before streaming starts;
+        failures after that are raised from the iterator. A cached response
+        is sent as a single chunk.
+        """
+        cached = await insight_cache.get(prompt.cache_key)
+        if cached is not None:
+            yield cached
+            return
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.AI_INSIGHT_TIMEOUT_SECONDS
+        chunks: list[str] = []
+
+        # Checked per await rather than with asyncio.timeout, which cannot
+        # safely span the generator's yields.
+        await asyncio.wait_for(_generation_slots.acquire(), deadline - loop.time())
+        try:
+            stream = await asyncio.wait_for(
+                self.client.aio.models.generate_content_stream(
+                    model=MODEL,
+                    contents=prompt.text
+                ),
+                deadline - loop.time()
+            )
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(anext(stream), deadline - loop.time())
+                except StopAsyncIteration:
+                    break
+                if chunk.text:
+                    chunks.append(chunk.text)
+                    yield chunk.text
+        finally:
+            _generation_slots.release()
+
+        if chunks:
+            await insight_cache.set(prompt.cache_key, "".join(chunks))
@@ -1,21 +1,92 @@
+from collections import Counter, defaultdict
+from typing import Iterable, NamedTuple
+from datetime import datetime, timezone
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy import func
 from fastapi import HTTPException
-from models.link import Link, LinkEvent
-from models.user import User
+from models.link import Link, LinkAgentRollup, LinkClickRollup, LinkCountryRollup, LinkVisitorSketch
+from core.utils.hll import HyperLogLog
 from core.utils.hashid import HashID
-from schemas.analytics import LinkAnalyticsResponse, ClickPerDay, ClickBySource, AllLinksAnalyticsResponse
+from core.utils.pagination import encode_cursor, keyset_page
+from core.utils.user_agent import Browser, Device
+from schemas.analytics import (
+    LinkAnalyticsResponse, ClickPerDay, ClickBySource, ClickByDevice, ClickByBrowser, ClickByCountry,
+    AllLinksAnalyticsResponse
+)
 from pydantic import HttpUrl
 from core.config import settings
+from services.auth import CurrentUser
+from services.click_rollup import day_bucket
+
+class AgentBreakdown(NamedTuple):
+    clicks_by_device: list[ClickByDevice]
+    clicks_by_browser: list[ClickByBrowser]
+    bot_clicks: int
+
+
+def _agent_breakdown(rows: Iterable) -> AgentBreakdown:
+    """Fold (device, browser, is_bot, clicks) rollup sums into per-device and per-browser human clicks."""
+    devices: Counter[int] = Counter()
+    browsers: Counter[int] = Counter()
+    bot_clicks = 0
+    for r in rows:
+        if r.is_bot:
+            bot_clicks += r.clicks
+        else:
+            devices[r.device] += r.clicks
+            browsers[r.browser] += r.clicks
+    return AgentBreakdown(
+        [ClickByDevice(device=Device(d).name.lower(), clicks=c) for d, c in devices.most_common()],
+        [ClickByBrowser(browser=Browser(b).name.lower(), clicks=c) for b, c in browsers.most_common()],
+        bot_clicks,
+    )
+
 
 class AnalyticsService:
-    def __init__(self, db: AsyncSession, user: User):
+    def __init__(self, db: AsyncSession, user: CurrentUser):
         self.db = db
         self.user = user
         
 
-    async def get_link_analytics(self, public_id: str) -> LinkAnalyticsResponse:
+    @staticmethod
+    def _range_filter(start: datetime | None, end: datetime | None, bucket=LinkClickRollup.bucket) -> list:
+        """Restrict daily rows (rollups by default) to the UTC days overlapping [start, end)."""
+        conditions = []
+        if start is not None:
+            conditions.append(bucket >= day_bucket(start))
+        if end is not None:
+            conditions.append(bucket < (end if end.tzinfo else end.replace(tzinfo=timezone.utc)))
+        return conditions
+
+    @staticmethod
+    def _build_response(
+        link: Link,
+        clicks_per_day: list[ClickPerDay],
+        clicks_by_source: list[ClickBySource],
+        clicks_by_country: list[ClickByCountry],
+        agents: AgentBreakdown,
+        unique_visitors: int
+    ) -> LinkAnalyticsResponse:
+        return LinkAnalyticsResponse(
+            shortended_url=HttpUrl(f"{settings.HOST_URL}/{link.public_id}"),
+            url=HttpUrl(link.url),
+            total_clicks=sum(cp.clicks for cp in clicks_per_day),
+            unique_visitors=unique_visitors,
+            clicks_per_day=clicks_per_day,
+            clicks_by_source=clicks_by_source,
+            clicks_by_device=agents.clicks_by_device,
+            clicks_by_browser=agents.clicks_by_browser,
+            clicks_by_country=clicks_by_country,
+            bot_clicks=agents.bot_clicks
+        )
+
+    async def get_link_analytics(
+        self,
+        public_id: str,
+        start: datetime | None = None,
+        end: datetime | None = None
+    ) -> LinkAnalyticsResponse:
         link_id = HashID.decode(public_id)
         result = await self.db.execute(
             select(Link).where(Link.id == link_id, Link.user_id == self.user.id)
@@ -25,22 +96,16 @@ class AnalyticsService:
         if not link:
             raise HTTPException(status_code=404, detail="Link not found")
 
-
-        total_clicks = await self.db.scalar(
-            select(func.count()).where(LinkEvent.link_id == link.id)
-        )
-
-        total_clicks = total_clicks or 0
-
+        in_range = self._range_filter(start, end)
 
         clicks_per_day_result = await self.db.execute(
             select(
-                func.date_trunc("day", LinkEvent.clicked_at).label("day"),
-                func.count().label("clicks")
+                LinkClickRollup.bucket.label("day"),
+                func.sum(LinkClickRollup.clicks).label("clicks")
             )
-            .where(LinkEvent.link_id == link.id)
-            .group_by("day")
-            .order_by("day")
+            .where(LinkClickRollup.link_id == link.id, *in_range)
+            .group_by(LinkClickRollup.bucket)
+            .order_by(LinkClickRollup.bucket)
         )
 
         clicks_per_day = [ClickPerDay(day=r.day, clicks=r.clicks) for r in clicks_per_day_result.all()]
@@ -48,33 +113,164 @@ class AnalyticsService:
 
         clicks_by_source_result = await self.db.execute(
             select(
-                LinkEvent.source,
-                func.count().label("clicks")
+                LinkClickRollup.source,
+                func.sum(LinkClickRollup.clicks).label("clicks")
             )
-            .where(LinkEvent.link_id == link.id)
-            .group_by(LinkEvent.source)
+            .where(LinkClickRollup.link_id == link.id, *in_range)
+            .group_by(LinkClickRollup.source)
         )
 
         clicks_by_source = [ClickBySource(source=r.source or "unknown", clicks=r.clicks) for r in clicks_by_source_result.all()]
 
-        return LinkAnalyticsResponse(
-            shortended_url=HttpUrl(f"{settings.HOST_URL}/{link.public_id}"),
-            url=HttpUrl(link.url),
-            total_clicks=total_clicks,
-            clicks_per_day=clicks_per_day,
-            clicks_by_source=clicks_by_source
+        clicks_by_country_result = await self.db.execute(
+            select(
+                LinkCountryRollup.country,
+                func.sum(LinkCountryRollup.clicks).label("clicks")
+            )
+            .where(LinkCountryRollup.link_id == link.id, *self._range_filter(start, end, LinkCountryRollup.bucket))
+            .group_by(LinkCountryRollup.country)
+            .order_by(func.sum(LinkCountryRollup.clicks).desc())
+        )
+
+        clicks_by_country = [ClickByCountry(country=r.country or "unknown", clicks=r.clicks) for r in clicks_by_country_result.all()]
+
+        agents_result = await self.db.execute(
+            select(
+                LinkAgentRollup.device,
+                LinkAgentRollup.browser,
+                LinkAgentRollup.is_bot,
+                func.sum(LinkAgentRollup.clicks).label("clicks")
+            )
+            .where(LinkAgentRollup.link_id == link.id, *self._range_filter(start, end, LinkAgentRollup.bucket))
+            .group_by(LinkAgentRollup.device, LinkAgentRollup.browser, LinkAgentRollup.is_bot)
+        )
+        agents = _agent_breakdown(agents_result.all())
+
+        # Daily sketches merge into one for the whole range.
+        sketches = await self.db.scalars(
+            select(LinkVisitorSketch.registers)
+            .where(LinkVisitorSketch.link_id == link.id, *self._range_filter(start, end, LinkVisitorSketch.bucket))
         )
+        unique_visitors = HyperLogLog.union(sketches).estimate()
 
-    async def get_all_links_analytics(self) -> AllLinksAnalyticsResponse:
-        result = await self.db.execute(select(Link).where(Link.user_id == self.user.id))
+        return self._build_response(link, clicks_per_day, clicks_by_source, clicks_by_country, agents, unique_visitors)
+
+    async def get_all_links_analytics(
+        self,
+        limit: int | None = None,
+        cursor: str | None = None,
+        public_ids: list[str] | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None
+    ) -> AllLinksAnalyticsResponse:
+        """
+        Analytics for one page of the user's links (newest first, all of them
+        when limit is None) in six queries regardless of page size: the
+        links themselves, daily, per-source, per-country and per-user-agent
+        totals grouped by link_id, and the visitor sketches.
+        """
+        links_query = select(Link).where(Link.user_id == self.user.id)
+        if public_ids:
+            links_query = links_query.where(Link.id.in_([HashID.decode(p) for p in public_ids]))
+        links_query = keyset_page(
+            links_query, Link.created_at, Link.id, cursor, None if limit is None else limit + 1
+        )
+
+        result = await self.db.execute(links_query)
         links = result.scalars().all()
-        
+
         if not links:
             return AllLinksAnalyticsResponse(links=[])
 
-        analytics = []
-        for link in links:
-            link_data = await self.get_link_analytics(link.public_id)
-            analytics.append(link_data)
+        next_cursor = None
+        if limit is not None and len(links) > limit:
+            links = links[:limit]
+            next_cursor = encode_cursor(links[-1].created_at, links[-1].id)
+            links_query = links_query.limit(limit)
+
+        # Join on the same page of links instead of binding one parameter per id.
+        page = links_query.with_only_columns(Link.id).subquery()
+        in_range = self._range_filter(start, end)
+
+        clicks_per_day_result = await self.db.execute(
+            select(
+                LinkClickRollup.link_id,
+                LinkClickRollup.bucket.label("day"),
+                func.sum(LinkClickRollup.clicks).label("clicks")
+            )
+            .join(page, page.c.id == LinkClickRollup.link_id)
+            .where(*in_range)
+            .group_by(LinkClickRollup.link_id, LinkClickRollup.bucket)
+            .order_by(LinkClickRollup.link_id, LinkClickRollup.bucket)
+        )
+        clicks_per_day: defaultdict[int, list[ClickPerDay]] = defaultdict(list)
+        for r in clicks_per_day_result.all():
+            clicks_per_day[r.link_id].append(ClickPerDay(day=r.day, clicks=r.clicks))
+
+        clicks_by_source_result = await self.db.execute(
+            select(
+                LinkClickRollup.link_id,
+                LinkClickRollup.source,
+                func.sum(LinkClickRollup.clicks).label("clicks")
+            )
+            .join(page, page.c.id == LinkClickRollup.link_id)
+            .where(*in_range)
+            .group_by(LinkClickRollup.link_id, LinkClickRollup.source)
+        )
+        clicks_by_source: defaultdict[int, list[ClickBySource]] = defaultdict(list)
+        for r in clicks_by_source_result.all():
+            clicks_by_source[r.link_id].append(ClickBySource(source=r.source or "unknown", clicks=r.clicks))
+
+        clicks_by_country_result = await self.db.execute(
+            select(
+                LinkCountryRollup.link_id,
+                LinkCountryRollup.country,
+                func.sum(LinkCountryRollup.clicks).label("clicks")
+            )
+            .join(page, page.c.id == LinkCountryRollup.link_id)
+            .where(*self._range_filter(start, end, LinkCountryRollup.bucket))
+            .group_by(LinkCountryRollup.link_id, LinkCountryRollup.country)
+            .order_by(LinkCountryRollup.link_id, func.sum(LinkCountryRollup.clicks).desc())
+        )
+        clicks_by_country: defaultdict[int, list[ClickByCountry]] = defaultdict(list)
+        for r in clicks_by_country_result.all():
+            clicks_by_country[r.link_id].append(ClickByCountry(country=r.country or "unknown", clicks=r.clicks))
+
+        agents_result = await self.db.execute(
+            select(
+                LinkAgentRollup.link_id,
+                LinkAgentRollup.device,
+                LinkAgentRollup.browser,
+                LinkAgentRollup.is_bot,
+                func.sum(LinkAgentRollup.clicks).label("clicks")
+            )
+            .join(page, page.c.id == LinkAgentRollup.link_id)
+            .where(*self._range_filter(start, end, LinkAgentRollup.bucket))
+            .group_by(LinkAgentRollup.link_id, LinkAgentRollup.device, LinkAgentRollup.browser, LinkAgentRollup.is_bot)
+        )
+        agent_rows: defaultdict[int, list] = defaultdict(list)
+        for r in agents_result.all():
+            agent_rows[r.link_id].append(r)
+
+        sketches_result = await self.db.execute(
+            select(LinkVisitorSketch.link_id, LinkVisitorSketch.registers)
+            .join(page, page.c.id == LinkVisitorSketch.link_id)
+            .where(*self._range_filter(start, end, LinkVisitorSketch.bucket))
+        )
+        sketches: defaultdict[int, list[bytes]] = defaultdict(list)
+        for r in sketches_result.all():
+            sketches[r.link_id].append(r.registers)
+
+        analytics = [
+            self._build_response(
+                link,
+                clicks_per_day[link.id],
+                clicks_by_source[link.id],
+                clicks_by_country[link.id],
+                _agent_breakdown(agent_rows[link.id]),
+                HyperLogLog.union(sketches[link.id]).estimate()
+            )
+            for link in links
+        ]
 
-        return AllLinksAnalyticsResponse(links=analytics)
+        return AllLinksAnalyticsResponse(links=analytics, next_cursor=next_cursor)
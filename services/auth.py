@@ -1,20 +1,47 @@
 import uuid
+from typing import NamedTuple
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import event, select
+from core.config import settings
 from core.database import get_db
+from core.utils.cache import LRUCache
 from models.user import User
-from core.security import hash_password, verify_password, create_access_token, create_refresh_token, verify_token
+from core.security import password_hasher, create_access_token, create_refresh_token, verify_token
 from core.utils.hashid import HashID
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
 
+class CurrentUser(NamedTuple):
+    """The authenticated principal: what handlers need without loading the User row."""
+    id: int
+    username: str
+
+    @property
+    def public_id(self) -> str:
+        return HashID.encode(self.id)
+
+
+# Decoded user id -> CurrentUser. The JWT is still verified on every request;
+# only the users lookup is cached.
+principal_cache = LRUCache(
+    max_entries=settings.AUTH_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.AUTH_CACHE_TTL_SECONDS,
+)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_principal(mapper, connection, target: User) -> None:
+    principal_cache.invalidate(target.id)
+
+
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: AsyncSession = Depends(get_db)
-) -> User:
+) -> CurrentUser:
     try:
         payload = verify_token(token)
         user_id = payload.get("sub")
@@ -22,12 +49,20 @@ async def get_current_user(
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
     except Exception:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-    result = await db.execute(select(User).where(User.id == HashID.decode(user_id)))
-    user = result.scalar_one_or_none()
-    if not user:
+
+    decoded_id = HashID.decode(user_id)
+    principal = principal_cache.get(decoded_id)
+    if principal is not None:
+        return principal
+
+    result = await db.execute(select(User.id, User.username).where(User.id == decoded_id))
+    row = result.one_or_none()
+    if not row:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
-    
-    return user
+
+    principal = CurrentUser(id=row.id, username=row.username)
+    principal_cache.set(decoded_id, principal)
+    return principal
 
 
 async def register_user(db: AsyncSession, username: str, password: str) -> User:
@@ -38,7 +73,7 @@ async def register_user(db: AsyncSession, username: str, password: str) -> User:
 
     user = User(
         username=username,
-        password_hash=hash_password(password)
+        password_hash=await password_hasher.hash(password)
     )
 
     db.add(user)
@@ -48,14 +83,18 @@ async def register_user(db: AsyncSession, username: str, password: str) -> User:
     return user
 
 
+def issue_tokens(user: User) -> tuple[str, str, str]:
+    access = create_access_token(str(user.public_id))
+    refresh = create_refresh_token(str(user.public_id))
+
+    return access, refresh, user.public_id
+
+
 async def authenticate_user(db: AsyncSession, username: str, password: str):
     result = await db.execute(select(User).where(User.username == username))
     user = result.scalar_one_or_none()
     
-    if not user or not verify_password(password, user.password_hash):
+    if not user or not await password_hasher.verify(password, user.password_hash):
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    access = create_access_token(str(user.public_id))
-    refresh = create_refresh_token(str(user.public_id))
-
-    return access, refresh, user.public_id
+    return issue_tokens(user)
@@ -0,0 +1,161 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+from sqlalchemy import insert, select
+from core.config import settings
+from core.database import engine
+from core.utils.geoip import geoip
+from core.utils.user_agent import classify_user_agent
+from models.link import Link, LinkEvent
+from services.click_rollup import apply_agent_rollups, apply_click_rollups, apply_country_rollups, apply_visitor_sketches
+
+# Matches LinkEvent.source; one oversized value would otherwise fail the whole batch.
+MAX_SOURCE_LENGTH = 512
+
+logger = logging.getLogger(__name__)
+
+
+class ClickIngestor:
+    """
+    Buffers click events in a bounded in-memory queue and writes them to
+    link_events with one multi-row INSERT per batch.
+
+    A flush happens as soon as batch_size events are waiting or every
+    flush_interval seconds, whichever comes first. When the queue is full,
+    record() waits for the writer to catch up instead of growing memory.
+
+    Each click is classified by user agent and geolocated on the way in. With bot_policy
+    "drop", bot clicks are counted and discarded; with "tag" they are stored
+    but kept out of click totals and unique visitors.
+    """
+
+    def __init__(self, batch_size: int, flush_interval: float, max_queue_size: int, bot_policy: str = "tag"):
+        if bot_policy not in ("tag", "drop"):
+            raise ValueError(f"Unknown bot click policy: {bot_policy!r}")
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue_size = max_queue_size
+        self.drop_bots = bot_policy == "drop"
+        self.queue: asyncio.Queue[dict] = asyncio.Queue(maxsize=max_queue_size)
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._closing = False
+        self.written = 0
+        self.dropped = 0
+        self.bots_dropped = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self._closing = False
+        self._task = asyncio.create_task(self._run(), name="click-ingestor")
+
+    async def stop(self) -> None:
+        """Stop the writer after flushing everything still queued."""
+        if self._task is None:
+            return
+        self._closing = True
+        self._wakeup.set()
+        await self._task
+        self._task = None
+
+    async def record(
+        self,
+        link_id: int,
+        ip_address: str | None = None,
+        user_agent: str | None = None,
+        source: str | None = None
+    ) -> None:
+        agent = classify_user_agent(user_agent)
+        if agent.is_bot and self.drop_bots:
+            self.bots_dropped += 1
+            return
+
+        event = {
+            "link_id": link_id,
+            "clicked_at": datetime.now(timezone.utc),
+            "ip_address": ip_address,
+            "user_agent": user_agent,
+            "source": source[:MAX_SOURCE_LENGTH] if source else source,
+            "device": agent.device,
+            "browser": agent.browser,
+            "is_bot": agent.is_bot,
+            "country": geoip.country(ip_address),
+        }
+
+        # Outside the app lifespan (scripts, one-off tasks) write straight through.
+        if self._task is None:
+            await self._write([event])
+            return
+
+        await self.queue.put(event)
+        if self.queue.qsize() >= self.batch_size:
+            self._wakeup.set()
+
+    async def flush(self) -> None:
+        while not self.queue.empty():
+            size = min(self.batch_size, self.queue.qsize())
+            batch = [self.queue.get_nowait() for _ in range(size)]
+            await self._write(batch)
+
+    async def _run(self) -> None:
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+        await self.flush()
+
+    async def _write(self, batch: list[dict]) -> None:
+        try:
+            async with engine.begin() as conn:
+                # Other workers can keep redirecting to a deleted link until
+                # their local cache entry expires. Keep clicks on links that
+                # still exist (locked so they cannot be deleted before commit)
+                # rather than failing the whole batch on the foreign key.
+                existing = set(await conn.scalars(
+                    select(Link.id)
+                    .where(Link.id.in_({event["link_id"] for event in batch}))
+                    .with_for_update(key_share=True)
+                ))
+                events = [event for event in batch if event["link_id"] in existing]
+                if events:
+                    await conn.execute(insert(LinkEvent), events)
+                humans = [event for event in events if not event["is_bot"]]
+                await apply_click_rollups(conn, humans)
+                await apply_country_rollups(conn, humans)
+                await apply_visitor_sketches(conn, humans)
+                await apply_agent_rollups(conn, events)
+        except Exception:
+            self.dropped += len(batch)
+            logger.exception("Failed to write %d click events", len(batch))
+            return
+
+        orphaned = len(batch) - len(events)
+        if orphaned:
+            self.dropped += orphaned
+            logger.warning("Dropped %d click events for deleted links", orphaned)
+        self.written += len(events)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "queue_depth": self.queue.qsize(),
+            "queue_max_size": self.max_queue_size,
+            "written": self.written,
+            "dropped": self.dropped,
+            "bots_dropped": self.bots_dropped,
+        }
+
+
+click_ingestor = ClickIngestor(
+    batch_size=settings.CLICK_BATCH_SIZE,
+    flush_interval=settings.CLICK_FLUSH_INTERVAL_SECONDS,
+    max_queue_size=settings.CLICK_QUEUE_MAX_SIZE,
+    bot_policy=settings.BOT_CLICK_POLICY,
+)
@@ -0,0 +1,368 @@
+from collections import Counter
+from datetime import datetime, timezone
+from sqlalchemy import bindparam, delete, func, select, text, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncConnection
+from core.utils.geoip import GeoIPLookup
+from core.utils.hll import HyperLogLog, visitor_hash
+from core.utils.user_agent import classify_user_agent
+from models.link import LinkAgentRollup, LinkClickRollup, LinkCountryRollup, LinkEvent, LinkVisitorSketch
+
+SKETCH_BACKFILL_FETCH_SIZE = 10_000
+CLASSIFY_BACKFILL_FETCH_SIZE = 10_000
+CLASSIFY_BACKFILL_INSERT_SIZE = 1_000
+GEOIP_BACKFILL_FETCH_SIZE = 10_000
+GEOIP_BACKFILL_INSERT_SIZE = 1_000
+SKETCH_BACKFILL_INSERT_SIZE = 500
+
+
+def day_bucket(clicked_at: datetime) -> datetime:
+    if clicked_at.tzinfo is None:
+        clicked_at = clicked_at.replace(tzinfo=timezone.utc)
+    return clicked_at.astimezone(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+async def apply_click_rollups(conn: AsyncConnection, events: list[dict]) -> None:
+    """
+    Add a batch of click events to link_click_rollups. Must run in the same
+    transaction that inserts the events so the two never drift apart.
+    """
+    if not events:
+        return
+    counts = Counter(
+        (event["link_id"], day_bucket(event["clicked_at"]), event["source"] or "")
+        for event in events
+    )
+    # Sorted so concurrent workers lock rollup rows in the same order.
+    rows = [
+        {"link_id": link_id, "bucket": bucket, "source": source, "clicks": clicks}
+        for (link_id, bucket, source), clicks in sorted(counts.items())
+    ]
+
+    stmt = insert(LinkClickRollup).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[LinkClickRollup.link_id, LinkClickRollup.bucket, LinkClickRollup.source],
+        set_={"clicks": LinkClickRollup.clicks + stmt.excluded.clicks},
+    )
+    await conn.execute(stmt)
+
+
+async def backfill_click_rollups(conn: AsyncConnection, since: datetime | None = None) -> int:
+    """
+    Rebuild link_click_rollups from link_events, either entirely or from the
+    day containing `since` onwards (which only scans the matching partitions).
+    Ingestion may keep running: the table lock makes concurrent batches wait
+    and apply on top of the rebuild.
+    """
+    await conn.execute(text(f"LOCK TABLE {LinkClickRollup.__tablename__} IN SHARE ROW EXCLUSIVE MODE"))
+
+    events = select(
+        LinkEvent.link_id,
+        func.date_trunc("day", LinkEvent.clicked_at, "UTC").label("day_bucket"),
+        func.coalesce(LinkEvent.source, "").label("source_key"),
+        func.count()
+    ).where(LinkEvent.is_bot.is_(False)).group_by(LinkEvent.link_id, "day_bucket", "source_key")
+    clear = delete(LinkClickRollup)
+
+    if since is not None:
+        start = day_bucket(since)
+        events = events.where(LinkEvent.clicked_at >= start)
+        clear = clear.where(LinkClickRollup.bucket >= start)
+
+    await conn.execute(clear)
+    result = await conn.execute(
+        insert(LinkClickRollup).from_select(["link_id", "bucket", "source", "clicks"], events)
+    )
+    return result.rowcount
+
+
+async def apply_agent_rollups(conn: AsyncConnection, events: list[dict]) -> None:
+    """
+    Add a batch of classified click events (bots included) to
+    link_agent_rollups, in the ingesting transaction.
+    """
+    if not events:
+        return
+    counts = Counter(
+        (event["link_id"], day_bucket(event["clicked_at"]), event["device"], event["browser"], event["is_bot"])
+        for event in events
+    )
+    rows = [
+        {"link_id": link_id, "bucket": bucket, "device": device, "browser": browser, "is_bot": is_bot, "clicks": clicks}
+        for (link_id, bucket, device, browser, is_bot), clicks in sorted(counts.items())
+    ]
+
+    stmt = insert(LinkAgentRollup).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[
+            LinkAgentRollup.link_id, LinkAgentRollup.bucket,
+            LinkAgentRollup.device, LinkAgentRollup.browser, LinkAgentRollup.is_bot,
+        ],
+        set_={"clicks": LinkAgentRollup.clicks + stmt.excluded.clicks},
+    )
+    await conn.execute(stmt)
+
+
+async def classify_stored_events(conn: AsyncConnection, since: datetime | None = None) -> int:
+    """
+    Fill device, browser and is_bot on link_events rows from their user
+    agent. Each distinct user agent is classified once; the results go into
+    a temporary table and are applied with a single UPDATE ... FROM, like
+    geolocate_stored_events. Returns the number of distinct user agents.
+    """
+    # No primary key: user agents are unbounded TEXT and could exceed the
+    # btree row limit. They are distinct already, and the join is hashed.
+    await conn.execute(text(
+        "CREATE TEMPORARY TABLE user_agent_backfill "
+        "(user_agent TEXT NOT NULL, device SMALLINT NOT NULL, browser SMALLINT NOT NULL, is_bot BOOLEAN NOT NULL) "
+        "ON COMMIT DROP"
+    ))
+    add = text(
+        "INSERT INTO user_agent_backfill (user_agent, device, browser, is_bot) "
+        "VALUES (:user_agent, :device, :browser, :is_bot)"
+    )
+
+    user_agents = select(LinkEvent.user_agent).where(LinkEvent.user_agent.is_not(None)).distinct()
+    if since is not None:
+        user_agents = user_agents.where(LinkEvent.clicked_at >= day_bucket(since))
+
+    classified = 0
+    pending: list[dict] = []
+    result = await conn.stream_scalars(user_agents.execution_options(yield_per=CLASSIFY_BACKFILL_FETCH_SIZE))
+    async for user_agent in result:
+        # Unknown user agents are written too: a row stored under older
+        # markers may carry a bot flag that no longer applies.
+        info = classify_user_agent(user_agent)
+        pending.append({"user_agent": user_agent, "device": info.device, "browser": info.browser, "is_bot": info.is_bot})
+        classified += 1
+        if len(pending) >= CLASSIFY_BACKFILL_INSERT_SIZE:
+            await conn.execute(add, pending)
+            pending = []
+    if pending:
+        await conn.execute(add, pending)
+    # Temporary tables are never auto-analyzed; without statistics the
+    # planner assumes a tiny table and may pick a nested loop.
+    await conn.execute(text("ANALYZE user_agent_backfill"))
+
+    update_events = (
+        "UPDATE link_events SET device = user_agent_backfill.device, browser = user_agent_backfill.browser, "
+        "is_bot = user_agent_backfill.is_bot FROM user_agent_backfill "
+        "WHERE link_events.user_agent = user_agent_backfill.user_agent"
+    )
+    params = {}
+    if since is not None:
+        update_events += " AND link_events.clicked_at >= :start"
+        params["start"] = day_bucket(since)
+    await conn.execute(text(update_events), params)
+    return classified
+
+
+async def backfill_agent_rollups(conn: AsyncConnection, since: datetime | None = None) -> int:
+    """Rebuild link_agent_rollups from (already classified) link_events, like backfill_click_rollups."""
+    await conn.execute(text(f"LOCK TABLE {LinkAgentRollup.__tablename__} IN SHARE ROW EXCLUSIVE MODE"))
+
+    events = select(
+        LinkEvent.link_id,
+        func.date_trunc("day", LinkEvent.clicked_at, "UTC").label("day_bucket"),
+        LinkEvent.device,
+        LinkEvent.browser,
+        LinkEvent.is_bot,
+        func.count()
+    ).group_by(LinkEvent.link_id, "day_bucket", LinkEvent.device, LinkEvent.browser, LinkEvent.is_bot)
+    clear = delete(LinkAgentRollup)
+
+    if since is not None:
+        start = day_bucket(since)
+        events = events.where(LinkEvent.clicked_at >= start)
+        clear = clear.where(LinkAgentRollup.bucket >= start)
+
+    await conn.execute(clear)
+    result = await conn.execute(
+        insert(LinkAgentRollup).from_select(["link_id", "bucket", "device", "browser", "is_bot", "clicks"], events)
+    )
+    return result.rowcount
+
+
+async def apply_country_rollups(conn: AsyncConnection, events: list[dict]) -> None:
+    """Add a batch of click events to link_country_rollups, in the ingesting transaction."""
+    if not events:
+        return
+    counts = Counter(
+        (event["link_id"], day_bucket(event["clicked_at"]), event["country"] or "")
+        for event in events
+    )
+    rows = [
+        {"link_id": link_id, "bucket": bucket, "country": country, "clicks": clicks}
+        for (link_id, bucket, country), clicks in sorted(counts.items())
+    ]
+
+    stmt = insert(LinkCountryRollup).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[LinkCountryRollup.link_id, LinkCountryRollup.bucket, LinkCountryRollup.country],
+        set_={"clicks": LinkCountryRollup.clicks + stmt.excluded.clicks},
+    )
+    await conn.execute(stmt)
+
+
+async def geolocate_stored_events(conn: AsyncConnection, lookup: GeoIPLookup, since: datetime | None = None) -> int:
+    """
+    Fill link_events.country from ip_address. Instead of one UPDATE per
+    address, the resolved countries go into a temporary table and are
+    applied with a single UPDATE ... FROM. Returns the number of addresses
+    with a country.
+    """
+    await conn.execute(text(
+        "CREATE TEMPORARY TABLE geoip_backfill (ip_address VARCHAR(45) PRIMARY KEY, country VARCHAR(2) NOT NULL) "
+        "ON COMMIT DROP"
+    ))
+    add = text("INSERT INTO geoip_backfill (ip_address, country) VALUES (:ip_address, :country)")
+
+    addresses = select(LinkEvent.ip_address).where(LinkEvent.ip_address.is_not(None)).distinct()
+    if since is not None:
+        addresses = addresses.where(LinkEvent.clicked_at >= day_bucket(since))
+
+    located = 0
+    pending: list[dict] = []
+    result = await conn.stream_scalars(addresses.execution_options(yield_per=GEOIP_BACKFILL_FETCH_SIZE))
+    async for ip_address in result:
+        country = lookup.country(ip_address)
+        if country is None:
+            continue
+        pending.append({"ip_address": ip_address, "country": country})
+        located += 1
+        if len(pending) >= GEOIP_BACKFILL_INSERT_SIZE:
+            await conn.execute(add, pending)
+            pending = []
+    if pending:
+        await conn.execute(add, pending)
+
+    update_events = (
+        "UPDATE link_events SET country = geoip_backfill.country FROM geoip_backfill "
+        "WHERE link_events.ip_address = geoip_backfill.ip_address"
+    )
+    params = {}
+    if since is not None:
+        update_events += " AND link_events.clicked_at >= :start"
+        params["start"] = day_bucket(since)
+    await conn.execute(text(update_events), params)
+    return located
+
+
+async def backfill_country_rollups(conn: AsyncConnection, since: datetime | None = None) -> int:
+    """Rebuild link_country_rollups from (already geolocated) link_events, like backfill_click_rollups."""
+    await conn.execute(text(f"LOCK TABLE {LinkCountryRollup.__tablename__} IN SHARE ROW EXCLUSIVE MODE"))
+
+    events = select(
+        LinkEvent.link_id,
+        func.date_trunc("day", LinkEvent.clicked_at, "UTC").label("day_bucket"),
+        func.coalesce(LinkEvent.country, "").label("country_key"),
+        func.count()
+    ).where(LinkEvent.is_bot.is_(False)).group_by(LinkEvent.link_id, "day_bucket", "country_key")
+    clear = delete(LinkCountryRollup)
+
+    if since is not None:
+        start = day_bucket(since)
+        events = events.where(LinkEvent.clicked_at >= start)
+        clear = clear.where(LinkCountryRollup.bucket >= start)
+
+    await conn.execute(clear)
+    result = await conn.execute(
+        insert(LinkCountryRollup).from_select(["link_id", "bucket", "country", "clicks"], events)
+    )
+    return result.rowcount
+
+
+async def apply_visitor_sketches(conn: AsyncConnection, events: list[dict]) -> None:
+    """
+    Fold a batch of click events into the per link-day HyperLogLog sketches.
+    Like apply_click_rollups, this runs in the ingesting transaction.
+    """
+    if not events:
+        return
+    sketches: dict[tuple[int, datetime], HyperLogLog] = {}
+    for event in events:
+        key = (event["link_id"], day_bucket(event["clicked_at"]))
+        sketch = sketches.get(key)
+        if sketch is None:
+            sketch = sketches[key] = HyperLogLog()
+        sketch.add_hash(visitor_hash(event["ip_address"], event["user_agent"]))
+    keys = sorted(sketches)
+
+    # Sketches can't be merged in SQL, so make sure every row exists, lock
+    # them (in key order, like the rollups) and merge in Python.
+    await conn.execute(
+        insert(LinkVisitorSketch)
+        .values([{"link_id": link_id, "bucket": bucket, "registers": b""} for link_id, bucket in keys])
+        .on_conflict_do_nothing()
+    )
+    stored = await conn.execute(
+        select(LinkVisitorSketch.link_id, LinkVisitorSketch.bucket, LinkVisitorSketch.registers)
+        .where(tuple_(LinkVisitorSketch.link_id, LinkVisitorSketch.bucket).in_(keys))
+        .order_by(LinkVisitorSketch.link_id, LinkVisitorSketch.bucket)
+        .with_for_update()
+    )
+    for row in stored:
+        if row.registers:
+            sketches[(row.link_id, day_bucket(row.bucket))].merge(HyperLogLog(row.registers))
+
+    table = LinkVisitorSketch.__table__
+    await conn.execute(
+        update(table)
+        .where(table.c.link_id == bindparam("key_link_id"), table.c.bucket == bindparam("key_bucket"))
+        .values(registers=bindparam("new_registers")),
+        [
+            {"key_link_id": link_id, "key_bucket": bucket, "new_registers": sketches[(link_id, bucket)].to_bytes()}
+            for link_id, bucket in keys
+        ]
+    )
+
+
+async def backfill_visitor_sketches(conn: AsyncConnection, since: datetime | None = None) -> int:
+    """
+    Rebuild link_visitor_sketches from link_events, like backfill_click_rollups.
+    Events are streamed in (link_id, clicked_at) order, so only one link's
+    sketches are held in memory at a time.
+    """
+    await conn.execute(text(f"LOCK TABLE {LinkVisitorSketch.__tablename__} IN SHARE ROW EXCLUSIVE MODE"))
+
+    events = select(
+        LinkEvent.link_id, LinkEvent.clicked_at, LinkEvent.ip_address, LinkEvent.user_agent
+    ).where(LinkEvent.is_bot.is_(False)).order_by(LinkEvent.link_id, LinkEvent.clicked_at)
+    clear = delete(LinkVisitorSketch)
+
+    if since is not None:
+        start = day_bucket(since)
+        events = events.where(LinkEvent.clicked_at >= start)
+        clear = clear.where(LinkVisitorSketch.bucket >= start)
+
+    await conn.execute(clear)
+
+    written = 0
+    pending: list[dict] = []
+    current_link = None
+    sketches: dict[datetime, HyperLogLog] = {}
+
+    async def flush(final: bool = False):
+        nonlocal written, pending
+        pending += (
+            {"link_id": current_link, "bucket": bucket, "registers": sketch.to_bytes()}
+            for bucket, sketch in sketches.items()
+        )
+        sketches.clear()
+        if pending and (final or len(pending) >= SKETCH_BACKFILL_INSERT_SIZE):
+            await conn.execute(insert(LinkVisitorSketch), pending)
+            written += len(pending)
+            pending = []
+
+    result = await conn.stream(events.execution_options(yield_per=SKETCH_BACKFILL_FETCH_SIZE))
+    async for row in result:
+        if row.link_id != current_link:
+            await flush()
+            current_link = row.link_id
+        bucket = day_bucket(row.clicked_at)
+        sketch = sketches.get(bucket)
+        if sketch is None:
+            sketch = sketches[bucket] = HyperLogLog()
+        sketch.add_hash(visitor_hash(row.ip_address, row.user_agent))
+    await flush(final=True)
+    return written
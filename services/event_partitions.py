@@ -0,0 +1,69 @@
+import asyncio
+import logging
+from datetime import date, datetime, timezone
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from core.database import engine
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary constant shared by all workers so only one creates partitions at a time.
+PARTITION_LOCK_KEY = 7_310_412
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+async def ensure_link_event_partitions(conn: AsyncConnection, months_ahead: int) -> None:
+    """
+    Create the monthly link_events partitions for the current month and the
+    next `months_ahead` months. Clicks never land in the DEFAULT partition as
+    long as this runs more often than every `months_ahead` months.
+
+    If clicks for a month did land in DEFAULT (e.g. workers were down or
+    clocks were off), CREATE TABLE ... PARTITION OF would fail on them, so
+    that month's partition is built detached, the rows are moved out of
+    DEFAULT, and it is attached afterwards.
+    """
+    await conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": PARTITION_LOCK_KEY})
+
+    current = datetime.now(timezone.utc).date().replace(day=1)
+    for offset in range(months_ahead + 1):
+        start = _add_months(current, offset)
+        end = _add_months(start, 1)
+        name = f"link_events_p{start:%Y_%m}"
+        if await conn.scalar(text("SELECT to_regclass(:name)"), {"name": name}) is not None:
+            continue
+
+        # Only dates are interpolated, never user input.
+        bounds = f"FROM ('{start.isoformat()} 00:00:00+00') TO ('{end.isoformat()} 00:00:00+00')"
+        in_range = f"clicked_at >= '{start.isoformat()} 00:00:00+00' AND clicked_at < '{end.isoformat()} 00:00:00+00'"
+        stranded = await conn.scalar(text(f"SELECT EXISTS (SELECT 1 FROM link_events_default WHERE {in_range})"))
+        if not stranded:
+            await conn.execute(text(f"CREATE TABLE {name} PARTITION OF link_events FOR VALUES {bounds}"))
+            continue
+
+        # Indexes and foreign keys are cloned from link_events on ATTACH.
+        await conn.execute(text(f"CREATE TABLE {name} (LIKE link_events INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+        moved = await conn.execute(text(
+            f"WITH moved AS (DELETE FROM link_events_default WHERE {in_range} RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        ))
+        await conn.execute(text(f"ALTER TABLE link_events ATTACH PARTITION {name} FOR VALUES {bounds}"))
+        logger.warning("Moved %d link_events rows from the DEFAULT partition into %s", moved.rowcount, name)
+
+
+async def maintain_link_event_partitions(months_ahead: int, interval_seconds: float) -> None:
+    """Background loop run for the lifetime of the app."""
+    while True:
+        try:
+            async with engine.begin() as conn:
+                await ensure_link_event_partitions(conn, months_ahead)
+        except Exception:
+            logger.exception(
+                "Failed to create link_events partitions; clicks keep going to link_events_default "
+                "until this succeeds (see README, Link Events Table)"
+            )
+        await asyncio.sleep(interval_seconds)
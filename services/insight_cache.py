@@ -0,0 +1,83 @@
+import hashlib
+import logging
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from core.config import settings
+from core.redis_client import get_redis
+from core.utils.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+
+def insight_cache_key(model: str, user_prompt: str, analytics_summary: str) -> str:
+    """
+    Digest of everything that determines a response. The user's prompt is
+    normalized (case and whitespace) so trivially different phrasings share
+    an entry. The analytics summary is used verbatim, so any new click
+    produces a new key.
+    """
+    normalized_prompt = " ".join(user_prompt.split()).casefold()
+    digest = hashlib.sha256()
+    for part in (model, normalized_prompt, analytics_summary):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class InsightCache:
+    """Generated insight text by content digest: per-process LRU plus optional shared Redis."""
+
+    def __init__(self, local: LRUCache, redis: Redis | None = None, ttl_seconds: int = 3600):
+        self.local = local
+        self.redis = redis
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(digest: str) -> str:
+        return f"insight:{digest}"
+
+    async def get(self, digest: str) -> str | None:
+        text = self.local.get(digest)
+        if text is None and self.redis is not None:
+            try:
+                text = await self.redis.get(self._key(digest))
+            except RedisError:
+                logger.warning("Redis insight cache lookup failed", exc_info=True)
+            if text is not None:
+                self.local.set(digest, text)
+
+        if text is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return text
+
+    async def set(self, digest: str, text: str) -> None:
+        self.local.set(digest, text)
+        if self.redis is None:
+            return
+        try:
+            await self.redis.set(self._key(digest), text, ex=self.ttl_seconds)
+        except RedisError:
+            logger.warning("Redis insight cache write failed", exc_info=True)
+
+    def stats(self) -> dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.local),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+insight_cache = InsightCache(
+    local=LRUCache(
+        max_entries=settings.AI_INSIGHT_CACHE_MAX_ENTRIES,
+        ttl_seconds=settings.AI_INSIGHT_CACHE_TTL_SECONDS,
+    ),
+    redis=get_redis(),
+    ttl_seconds=settings.AI_INSIGHT_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,82 @@
+from collections import Counter
+from datetime import date, timedelta
+from typing import Iterable, List
+from schemas.analytics import ClickBySource, ClickPerDay, LinkAnalyticsResponse
+
+# Daily series longer than this are folded into weeks, and weekly series
+# longer than MAX_WEEKLY_POINTS into months.
+MAX_DAILY_POINTS = 31
+MAX_WEEKLY_POINTS = 26
+# Sources beyond the busiest few are reported as a single "other" entry.
+MAX_SOURCES = 5
+# Room kept for the closing "N more links" line.
+OMITTED_LINE_RESERVE = 80
+
+
+def _bucket_series(points: List[ClickPerDay]) -> tuple[str, Iterable[tuple[str, int]]]:
+    if len(points) <= MAX_DAILY_POINTS:
+        return "daily", ((p.day.date().isoformat(), p.clicks) for p in points)
+
+    # Aggregate on dates/tuples and only format the surviving buckets.
+    weeks: Counter[date] = Counter()
+    for p in points:
+        day = p.day.date()
+        weeks[day - timedelta(days=day.weekday())] += p.clicks
+    if len(weeks) <= MAX_WEEKLY_POINTS:
+        return "weekly (week starting)", ((week.isoformat(), clicks) for week, clicks in sorted(weeks.items()))
+
+    months: Counter[tuple[int, int]] = Counter()
+    for p in points:
+        months[(p.day.year, p.day.month)] += p.clicks
+    return "monthly", ((f"{year}-{month:02d}", clicks) for (year, month), clicks in sorted(months.items()))
+
+
+def _fold_sources(sources: List[ClickBySource]) -> list[tuple[str, int]]:
+    ranked = sorted(((s.source, s.clicks) for s in sources), key=lambda s: s[1], reverse=True)
+    if len(ranked) <= MAX_SOURCES + 1:
+        return ranked
+    head, tail = ranked[:MAX_SOURCES], ranked[MAX_SOURCES:]
+    return head + [("other", sum(clicks for _, clicks in tail))]
+
+
+def _describe(link: LinkAnalyticsResponse) -> str:
+    granularity, series = _bucket_series(link.clicks_per_day)
+    series_text = ", ".join(f"{label}: {clicks}" for label, clicks in series) or "no clicks"
+    source_text = ", ".join(
+        f"{source} ({clicks})" for source, clicks in _fold_sources(link.clicks_by_source)
+    ) or "no sources recorded"
+    device_text = ", ".join(f"{d.device} ({d.clicks})" for d in link.clicks_by_device) or "unknown"
+    country_text = ", ".join(f"{c.country} ({c.clicks})" for c in link.clicks_by_country[:5]) or "unknown"
+    return (
+        f"Link {link.shortended_url} ({link.url}): "
+        f"{link.total_clicks} total clicks from ~{link.unique_visitors} unique visitors; "
+        f"{granularity} breakdown: {series_text}; "
+        f"sources: {source_text}; devices: {device_text}; top countries: {country_text}; "
+        f"{link.bot_clicks} bot clicks excluded.\n"
+    )
+
+
+def summarize_analytics(analytics: List[LinkAnalyticsResponse], max_chars: int) -> str:
+    """
+    Describe the user's links for the LLM prompt within max_chars, most-clicked
+    links first. Long daily series are coarsened and rare sources folded into
+    "other"; links that no longer fit are counted in a closing line.
+    """
+    ranked = sorted(analytics, key=lambda link: link.total_clicks, reverse=True)
+    budget = max(0, max_chars - OMITTED_LINE_RESERVE)
+
+    lines: list[str] = []
+    used = 0
+    for index, link in enumerate(ranked):
+        line = _describe(link)
+        if used + len(line) > budget:
+            omitted = ranked[index:]
+            lines.append(
+                f"{len(omitted)} less active links omitted "
+                f"({sum(link.total_clicks for link in omitted)} total clicks).\n"
+            )
+            break
+        lines.append(line)
+        used += len(line)
+
+    return "".join(lines)
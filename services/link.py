@@ -1,17 +1,20 @@
-from typing import Optional
+from typing import AsyncIterator, Optional, Sequence
 from pydantic import HttpUrl
+from sqlalchemy import Row, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from fastapi import Depends, HTTPException
 from models.link import Link
+from schemas.link import LinkCreate
 from core.utils.hashid import HashID
+from core.utils.pagination import encode_cursor, keyset_page
 from core.database import get_db
-from models.user import User
-from services.auth import get_current_user
+from services.auth import CurrentUser, get_current_user
+from services.redirect_cache import redirect_cache
 
 
 class LinkService:
-    def __init__(self, db: AsyncSession, user: User):
+    def __init__(self, db: AsyncSession, user: CurrentUser):
         self.db = db
         self.user = user
 
@@ -20,11 +23,42 @@ class LinkService:
         self.db.add(new_link)
         await self.db.commit()
         await self.db.refresh(new_link)
+        # Drop any "not found" entry cached while this id was still unused.
+        await redirect_cache.invalidate(new_link.id)
         return new_link
 
-    async def get_links(self):
-        result = await self.db.execute(select(Link).where(Link.user_id == self.user.id))
-        return result.scalars().all()
+    async def create_links(
+        self,
+        links: list[LinkCreate],
+        chunk_size: int
+    ) -> AsyncIterator[Sequence[Row]]:
+        """
+        Insert links with one multi-row INSERT ... RETURNING per chunk,
+        committing and yielding each chunk's rows (in input order) as it lands.
+        """
+        for start in range(0, len(links), chunk_size):
+            chunk = links[start:start + chunk_size]
+            result = await self.db.execute(
+                insert(Link).returning(
+                    Link.id, Link.title, Link.url, Link.created_at, sort_by_parameter_order=True
+                ),
+                [{"user_id": self.user.id, "title": l.title, "url": str(l.url)} for l in chunk]
+            )
+            rows = result.all()
+            await self.db.commit()
+            await redirect_cache.invalidate_many([row.id for row in rows])
+            yield rows
+
+    async def get_links(self, cursor: Optional[str], limit: int) -> tuple[Sequence[Link], Optional[str]]:
+        """One page of the user's links, newest first, and the cursor for the next page."""
+        result = await self.db.execute(
+            keyset_page(select(Link).where(Link.user_id == self.user.id), Link.created_at, Link.id, cursor, limit + 1)
+        )
+        links = result.scalars().all()
+        if len(links) <= limit:
+            return links, None
+        links = links[:limit]
+        return links, encode_cursor(links[-1].created_at, links[-1].id)
 
     async def get_link(self, link_id: str) -> Link:
         result = await self.db.execute(
@@ -42,6 +76,7 @@ class LinkService:
         if url:
             link.url = str(url)
         await self.db.commit()
+        await redirect_cache.invalidate(link.id)
         await self.db.refresh(link)
         return link
 
@@ -49,11 +84,12 @@ class LinkService:
         link = await self.get_link(link_id)
         await self.db.delete(link)
         await self.db.commit()
+        await redirect_cache.invalidate(link.id)
 
 
 
 async def get_link_service(
     db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user)
+    user: CurrentUser = Depends(get_current_user)
 ) -> LinkService:
     return LinkService(db, user)
@@ -1,43 +1,59 @@
-from datetime import datetime, timezone
 from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from models.link import Link, LinkEvent
+from models.link import Link
+from core.database import AsyncSessionLocal
 from core.utils.hashid import HashID
+from services.redirect_cache import redirect_cache, NOT_FOUND
 
 
 class LinkRedirectService:
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession | None = None):
         self.db = db
 
+    async def _get_link(self, link_id: int) -> Link | None:
+        result = await self.db.execute(select(Link).where(Link.id == link_id))  # type: ignore
+        return result.scalar_one_or_none()
+
+    async def _fetch_url(self, link_id: int) -> str | None:
+        query = select(Link.url).where(Link.id == link_id)
+        if self.db is not None:
+            return await self.db.scalar(query)
+
+        # Opened lazily so cache hits never create a session. Misses go to
+        # the primary, not the replica: the result is cached for up to
+        # REDIRECT_REDIS_TTL_SECONDS, so a lagging replica would re-cache the
+        # URL a link had before an edit (or a 404 for a new link).
+        async with AsyncSessionLocal() as db:
+            return await db.scalar(query)
+
     async def get_link_by_public_id(self, public_id: str) -> Link:
         """Fetch a link by its public ID"""
         link_id = HashID.decode(public_id)
         if not link_id:
             raise HTTPException(status_code=404, detail="Link not found")
 
-        result = await self.db.execute(select(Link).where(Link.id == link_id))
-        link = result.scalar_one_or_none()
+        link = await self._get_link(link_id)
         if not link:
             raise HTTPException(status_code=404, detail="Link not found")
         return link
 
-    async def record_click(
-        self,
-        link: Link,
-        ip_address: str | None = None,
-        user_agent: str | None = None,
-        source: str | None = None
-    ):
-        """Record a click event for analytics"""
-        event = LinkEvent(
-            link_id=link.id,
-            clicked_at=datetime.now(timezone.utc),
-            ip_address=ip_address,
-            user_agent=user_agent,
-            source=source
-        )
-        self.db.add(event)
-        await self.db.commit()
-    
-    
+    async def get_link_url(self, public_id: str) -> str:
+        """Resolve a public ID to its destination URL, serving hot links from cache"""
+        return await self.get_url(HashID.decode(public_id))
+
+    async def get_url(self, link_id: int) -> str:
+        """Resolve a decoded link id to its destination URL, serving hot links from cache"""
+        if not link_id:
+            raise HTTPException(status_code=404, detail="Link not found")
+
+        url = await redirect_cache.get(link_id)
+        if url is None:
+            url = await self._fetch_url(link_id)
+            if url is None:
+                await redirect_cache.set_not_found(link_id)
+                raise HTTPException(status_code=404, detail="Link not found")
+            await redirect_cache.set(link_id, url)
+        if url == NOT_FOUND:
+            raise HTTPException(status_code=404, detail="Link not found")
+        return url
@@ -0,0 +1,130 @@
+from core import metrics
+from core.database import pool_stats
+from core.security import password_hasher
+from core.utils import user_agent
+from core.utils.geoip import geoip
+from services.auth import principal_cache
+from services.click_ingest import click_ingestor
+from services.insight_cache import insight_cache
+from services.rate_limit import rate_limiter
+from services.redirect_cache import redirect_cache
+
+
+def _hit_ratio(hits: int, misses: int) -> float:
+    lookups = hits + misses
+    return hits / lookups if lookups else 0.0
+
+
+def render_metrics() -> str:
+    """Everything /metrics exposes, in the Prometheus text exposition format."""
+    lines = []
+    for histogram in (
+        metrics.request_duration,
+        metrics.redirect_duration,
+        metrics.request_queries,
+        metrics.request_query_time,
+        metrics.query_duration,
+    ):
+        lines += histogram.render()
+
+    lines += metrics.render_gauges(
+        "http_requests_in_flight", "Requests currently being served.",
+        {(): metrics.requests_in_flight.value},
+    )
+
+    clicks = click_ingestor.stats()
+    lines += metrics.render_gauges(
+        "click_queue_depth", "Click events buffered and waiting to be written.",
+        {(): clicks["queue_depth"]},
+    )
+    lines += metrics.render_gauges(
+        "click_queue_max_size", "Capacity of the click event buffer.",
+        {(): clicks["queue_max_size"]},
+    )
+    lines += metrics.render_gauges(
+        "click_events_total", "Click events written or dropped by the ingestor.",
+        {("written",): clicks["written"], ("dropped",): clicks["dropped"], ("bot_dropped",): clicks["bots_dropped"]},
+        ("outcome",), kind="counter",
+    )
+
+    limits = rate_limiter.stats()
+    lines += metrics.render_gauges(
+        "redirect_rate_limit_total", "Redirects checked against the per-IP and per-link rate limits.",
+        {("allowed",): limits["allowed"], ("limited",): limits["limited"]},
+        ("outcome",), kind="counter",
+    )
+    lines += metrics.render_gauges(
+        "redirect_rate_limit_buckets", "Token buckets held in-process by the redirect rate limiter.",
+        {(): limits["keys"]},
+    )
+    lines += metrics.render_gauges(
+        "redirect_rate_limit_evictions_total", "In-process rate limit buckets evicted because their shard was full.",
+        {(): limits["evicted"]}, kind="counter",
+    )
+    lines += metrics.render_gauges(
+        "redirect_rate_limit_redis_errors_total", "Rate limit checks that fell back to local buckets after a Redis error.",
+        {(): limits["redis_errors"]}, kind="counter",
+    )
+
+    redirect = redirect_cache.stats()
+    auth = principal_cache.stats()
+    insight = insight_cache.stats()
+    agents = user_agent.cache_stats()
+    geo = geoip.stats()
+    caches = {
+        "redirect_local": (redirect["hits"], redirect["misses"]),
+        "redirect_redis": (redirect["redis_hits"], redirect["redis_misses"]),
+        "auth": (auth["hits"], auth["misses"]),
+        "ai_insight": (insight["hits"], insight["misses"]),
+        "user_agent": (agents["hits"], agents["misses"]),
+        "geoip": (geo["hits"], geo["misses"]),
+    }
+    lines += metrics.render_gauges(
+        "cache_hits_total", "Cache lookups that found an entry.",
+        {(name,): hits for name, (hits, _) in caches.items()}, ("cache",), kind="counter",
+    )
+    lines += metrics.render_gauges(
+        "cache_misses_total", "Cache lookups that found nothing.",
+        {(name,): misses for name, (_, misses) in caches.items()}, ("cache",), kind="counter",
+    )
+    lines += metrics.render_gauges(
+        "cache_hit_ratio", "Share of cache lookups that were hits since the worker started.",
+        {(name,): _hit_ratio(hits, misses) for name, (hits, misses) in caches.items()}, ("cache",),
+    )
+    lines += metrics.render_gauges(
+        "cache_entries", "Entries held in the in-process cache.",
+        {
+            ("redirect_local",): redirect["size"],
+            ("auth",): auth["size"],
+            ("ai_insight",): insight["size"],
+            ("user_agent",): agents["size"],
+            ("geoip",): geo["size"],
+        },
+        ("cache",),
+    )
+
+    pools = pool_stats()
+    for key, name, description, kind in (
+        ("checked_out", "db_pool_checked_out", "Connections currently checked out.", "gauge"),
+        ("capacity", "db_pool_capacity", "Pool size plus max overflow.", "gauge"),
+        ("saturation", "db_pool_saturation", "Checked-out connections as a share of capacity.", "gauge"),
+        ("checkouts", "db_pool_checkouts_total", "Connections checked out from the pool.", "counter"),
+        ("checkout_seconds_total", "db_pool_checkout_seconds_total", "Time spent waiting to check out connections.", "counter"),
+        ("checkout_seconds_max", "db_pool_checkout_seconds_max", "Longest single checkout wait.", "gauge"),
+        ("timeouts", "db_pool_timeouts_total", "Checkouts that gave up after DB_POOL_TIMEOUT_SECONDS.", "counter"),
+    ):
+        lines += metrics.render_gauges(
+            name, description, {(engine,): stats[key] for engine, stats in pools.items()}, ("engine",), kind=kind,
+        )
+
+    hashing = password_hasher.stats()
+    lines += metrics.render_gauges(
+        "password_hash_waiting", "bcrypt operations waiting for a free worker.",
+        {(): hashing["waiting"]},
+    )
+    lines += metrics.render_gauges(
+        "password_hash_queue_seconds_total", "Time bcrypt operations spent waiting for a worker.",
+        {(): hashing["queue_seconds_total"]}, kind="counter",
+    )
+
+    return "\n".join(lines) + "\n"
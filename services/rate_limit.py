@@ -0,0 +1,238 @@
+import asyncio
+import logging
+import math
+import socket
+import time
+from typing import Callable
+from redis.asyncio import Redis
+from redis.commands.core import AsyncScript
+from redis.exceptions import RedisError
+from core.config import settings
+from core.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Both buckets are checked and only debited together, so a click refused by
+# one limit does not use up the other. Returns 0 when allowed, otherwise the
+# milliseconds until the emptier bucket has a token again. Uses the Redis
+# clock so every node agrees on elapsed time. A refused click writes nothing:
+# the refill is derived from the stored timestamp, and missing keys read as
+# full buckets.
+_TOKEN_BUCKETS_LUA = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local tokens = {}
+local wait = 0
+for i = 1, 2 do
+    local rate = tonumber(ARGV[2 * i - 1])
+    local burst = tonumber(ARGV[2 * i])
+    local state = redis.call('HMGET', KEYS[i], 'tokens', 'ts')
+    local available = tonumber(state[1])
+    if available == nil then
+        available = burst
+    else
+        available = math.min(burst, available + (now - tonumber(state[2])) * rate)
+    end
+    tokens[i] = available
+    if available < 1 then
+        wait = math.max(wait, (1 - available) / rate)
+    end
+end
+if wait > 0 then
+    return math.ceil(wait * 1000)
+end
+for i = 1, 2 do
+    local rate = tonumber(ARGV[2 * i - 1])
+    local burst = tonumber(ARGV[2 * i])
+    redis.call('HSET', KEYS[i], 'tokens', tostring(tokens[i] - 1), 'ts', string.format('%.6f', now))
+    redis.call('PEXPIRE', KEYS[i], math.ceil(burst / rate * 1000))
+end
+return 0
+"""
+
+
+def client_key(ip_address: str) -> str:
+    """IPv6 clients are limited per /64, since one host can hold a whole /64."""
+    if ":" not in ip_address:
+        return ip_address
+    try:
+        return socket.inet_pton(socket.AF_INET6, ip_address)[:8].hex()
+    except OSError:
+        return ip_address
+
+
+class RedirectRateLimiter:
+    """
+    Token buckets per client IP and per (client IP, link) on the redirect path.
+
+    Buckets live in sharded dicts of [tokens, last_update] pairs. The event
+    loop is single threaded, so they are updated without locks. A bucket is
+    only stored once a token is taken from it; a missing bucket is full. A
+    background task drops buckets that have refilled completely
+    (compact_forever), one shard at a time so it never holds the loop for
+    long. A shard holding max_buckets evicts its oldest bucket to make room,
+    which bounds memory when many clients arrive between compactions.
+
+    Over the limit, the click is either not recorded (policy "skip") or the
+    redirect is refused with 429 ("reject"); the caller acts on `reject`.
+
+    With the "redis" backend, buckets are kept in Redis instead (one script call
+    per redirect) and enforced across every worker and node. If Redis fails,
+    the in-process buckets are used until it recovers. The client comes from
+    the `redis` callable on every check, since the lifespan closes and
+    replaces the shared client.
+    """
+
+    def __init__(
+        self,
+        ip_rate: float,
+        ip_burst: int,
+        link_rate: float,
+        link_burst: int,
+        shards: int = 64,
+        max_buckets: int = 8_192,
+        policy: str = "skip",
+        backend: str = "memory",
+        redis: Callable[[], Redis | None] = get_redis,
+        enabled: bool = True,
+    ):
+        if policy not in ("skip", "reject"):
+            raise ValueError(f"Unknown rate limit policy: {policy!r}")
+        if backend not in ("memory", "redis"):
+            raise ValueError(f"Unknown rate limit backend: {backend!r}")
+        if backend == "redis" and redis() is None:
+            raise ValueError("The redis rate limit backend needs a Redis client (set REDIS_URL)")
+        self.ip_rate = ip_rate
+        self.ip_burst = ip_burst
+        self.link_rate = link_rate
+        self.link_burst = link_burst
+        self._redis = redis if backend == "redis" else None
+        self.enabled = enabled
+        self.reject = policy == "reject"
+        self.max_buckets = max_buckets
+        self._shards: list[dict] = [{} for _ in range(shards)]
+        self._script: AsyncScript | None = None
+        self.allowed = 0
+        self.limited = 0
+        self.redis_errors = 0
+        self.evicted = 0
+
+    def _shard(self, key) -> dict:
+        return self._shards[hash(key) % len(self._shards)]
+
+    async def check(self, ip_address: str | None, link_id: int) -> float:
+        """Take a token for this click; returns 0.0 if allowed, else seconds until it would be."""
+        if not self.enabled or not ip_address:
+            return 0.0
+
+        client = client_key(ip_address)
+        if (script := self._redis_script()) is not None:
+            try:
+                wait_ms = await script(
+                    keys=[f"ratelimit:{{{client}}}", f"ratelimit:{{{client}}}:{link_id}"],
+                    args=[self.ip_rate, self.ip_burst, self.link_rate, self.link_burst],
+                )
+            except RedisError:
+                self.redis_errors += 1
+                logger.warning("Redis rate limit check failed; using local buckets", exc_info=True)
+            else:
+                return self._count(wait_ms / 1000)
+
+        now = time.monotonic()
+        # The IP bucket goes first, so a client over its overall limit does
+        # not leave a bucket behind for every link it hits.
+        ip_shard = self._shard(client)
+        ip_tokens = self._tokens(ip_shard.get(client), self.ip_rate, self.ip_burst, now)
+        if ip_tokens < 1:
+            return self._count((1 - ip_tokens) / self.ip_rate)
+
+        link_key = (client, link_id)
+        link_shard = self._shard(link_key)
+        link_tokens = self._tokens(link_shard.get(link_key), self.link_rate, self.link_burst, now)
+        if link_tokens < 1:
+            return self._count((1 - link_tokens) / self.link_rate)
+
+        self._take(ip_shard, client, ip_tokens, now)
+        self._take(link_shard, link_key, link_tokens, now)
+        return self._count(0.0)
+
+    def _redis_script(self) -> AsyncScript | None:
+        redis = self._redis() if self._redis is not None else None
+        if redis is None:
+            return None
+        if self._script is None or self._script.registered_client is not redis:
+            self._script = redis.register_script(_TOKEN_BUCKETS_LUA)
+        return self._script
+
+    @staticmethod
+    def _tokens(bucket: list[float] | None, rate: float, burst: int, now: float) -> float:
+        if bucket is None:
+            return float(burst)
+        return min(burst, bucket[0] + (now - bucket[1]) * rate)
+
+    def _take(self, shard: dict, key, tokens: float, now: float) -> None:
+        bucket = shard.get(key)
+        if bucket is not None:
+            bucket[0] = tokens - 1
+            bucket[1] = now
+            return
+        if len(shard) >= self.max_buckets:
+            # Dicts keep insertion order, so this is the bucket created
+            # longest ago; dropping it only refills it early.
+            del shard[next(iter(shard))]
+            self.evicted += 1
+        shard[key] = [tokens - 1, now]
+
+    def _count(self, wait: float) -> float:
+        if wait:
+            self.limited += 1
+        else:
+            self.allowed += 1
+        return wait
+
+    def compact_shard(self, index: int, now: float | None = None) -> int:
+        """Drop the shard's buckets that would be full by now; returns how many."""
+        now = time.monotonic() if now is None else now
+        shard = self._shards[index]
+        ip_full_after = self.ip_burst / self.ip_rate
+        link_full_after = self.link_burst / self.link_rate
+        idle = [
+            key for key, (_, updated) in shard.items()
+            if now - updated >= (link_full_after if isinstance(key, tuple) else ip_full_after)
+        ]
+        for key in idle:
+            del shard[key]
+        return len(idle)
+
+    async def compact_forever(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            for index in range(len(self._shards)):
+                self.compact_shard(index)
+                await asyncio.sleep(0)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "keys": sum(len(shard) for shard in self._shards),
+            "allowed": self.allowed,
+            "limited": self.limited,
+            "redis_errors": self.redis_errors,
+            "evicted": self.evicted,
+        }
+
+
+def retry_after(wait: float) -> str:
+    return str(max(1, math.ceil(wait)))
+
+
+rate_limiter = RedirectRateLimiter(
+    ip_rate=settings.RATE_LIMIT_IP_PER_SECOND,
+    ip_burst=settings.RATE_LIMIT_IP_BURST,
+    link_rate=settings.RATE_LIMIT_LINK_PER_SECOND,
+    link_burst=settings.RATE_LIMIT_LINK_BURST,
+    shards=settings.RATE_LIMIT_SHARDS,
+    max_buckets=settings.RATE_LIMIT_MAX_BUCKETS_PER_SHARD,
+    policy=settings.RATE_LIMIT_POLICY,
+    backend=settings.RATE_LIMIT_BACKEND,
+    enabled=settings.RATE_LIMIT_ENABLED,
+)
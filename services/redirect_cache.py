@@ -0,0 +1,122 @@
+import logging
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from core.config import settings
+from core.redis_client import get_redis
+from core.utils.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# Stored in Redis for ids that do not exist, so repeated probes for unknown
+# short codes stop at Redis instead of reaching Postgres. URLs are never empty.
+NOT_FOUND = ""
+
+
+class RedirectCache:
+    """
+    Two-tier link id -> destination URL cache.
+
+    The per-process LRU answers hot links without any I/O. The optional Redis
+    tier is shared by every worker and node, and also remembers unknown ids for
+    a short time. Redis failures are treated as misses so redirects keep
+    working off the database.
+    """
+
+    def __init__(
+        self,
+        local: LRUCache,
+        redis: Redis | None = None,
+        ttl_seconds: int = 3600,
+        negative_ttl_seconds: int = 30,
+    ):
+        self.local = local
+        self.redis = redis
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.redis_hits = 0
+        self.redis_misses = 0
+        self.negative_hits = 0
+        self.redis_errors = 0
+
+    @staticmethod
+    def _key(link_id: int) -> str:
+        return f"redirect:{link_id}"
+
+    async def get(self, link_id: int) -> str | None:
+        """Return the cached URL, NOT_FOUND for a cached miss, or None if unknown."""
+        url = self.local.get(link_id)
+        if url is not None or self.redis is None:
+            return url
+
+        try:
+            url = await self.redis.get(self._key(link_id))
+        except RedisError:
+            self.redis_errors += 1
+            logger.warning("Redis redirect cache lookup failed", exc_info=True)
+            return None
+
+        if url is None:
+            self.redis_misses += 1
+        elif url == NOT_FOUND:
+            self.negative_hits += 1
+        else:
+            self.redis_hits += 1
+            self.local.set(link_id, url)
+        return url
+
+    async def set(self, link_id: int, url: str) -> None:
+        self.local.set(link_id, url)
+        await self._redis_set(link_id, url, self.ttl_seconds)
+
+    async def set_not_found(self, link_id: int) -> None:
+        await self._redis_set(link_id, NOT_FOUND, self.negative_ttl_seconds)
+
+    async def invalidate(self, link_id: int) -> None:
+        self.local.invalidate(link_id)
+        if self.redis is None:
+            return
+        try:
+            await self.redis.delete(self._key(link_id))
+        except RedisError:
+            self.redis_errors += 1
+            logger.warning("Redis redirect cache invalidation failed", exc_info=True)
+
+    async def invalidate_many(self, link_ids: list[int]) -> None:
+        for link_id in link_ids:
+            self.local.invalidate(link_id)
+        if self.redis is None or not link_ids:
+            return
+        try:
+            await self.redis.delete(*(self._key(link_id) for link_id in link_ids))
+        except RedisError:
+            self.redis_errors += 1
+            logger.warning("Redis redirect cache invalidation failed", exc_info=True)
+
+    async def _redis_set(self, link_id: int, value: str, ttl_seconds: int) -> None:
+        if self.redis is None:
+            return
+        try:
+            await self.redis.set(self._key(link_id), value, ex=ttl_seconds)
+        except RedisError:
+            self.redis_errors += 1
+            logger.warning("Redis redirect cache write failed", exc_info=True)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            **self.local.stats(),
+            "redis_hits": self.redis_hits,
+            "redis_misses": self.redis_misses,
+            "negative_hits": self.negative_hits,
+            "redis_errors": self.redis_errors,
+        }
+
+
+redirect_cache = RedirectCache(
+    local=LRUCache(
+        max_entries=settings.REDIRECT_CACHE_MAX_ENTRIES,
+        ttl_seconds=settings.REDIRECT_CACHE_TTL_SECONDS,
+    ),
+    redis=get_redis(),
+    ttl_seconds=settings.REDIRECT_REDIS_TTL_SECONDS,
+    negative_ttl_seconds=settings.REDIRECT_NEGATIVE_TTL_SECONDS,
+)
@@ -0,0 +1,102 @@
+import asyncio
+import logging
+import time
+from contextlib import AsyncExitStack
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from core.config import settings
+from core.database import engine, read_engine
+from core.redis_client import get_redis
+from core.validators.password import load_common_passwords
+from models.link import Link, LinkClickRollup
+from services.click_rollup import day_bucket
+from services.redirect_cache import redirect_cache
+
+logger = logging.getLogger(__name__)
+
+
+async def warm_pool(pool_engine: AsyncEngine, connections: int) -> None:
+    """Open `connections` connections at once and return them, so the pool keeps them idle."""
+    async with AsyncExitStack() as stack:
+        results = await asyncio.gather(
+            *(stack.enter_async_context(pool_engine.connect()) for _ in range(connections)),
+            return_exceptions=True,
+        )
+        conns = [r for r in results if not isinstance(r, BaseException)]
+        await asyncio.gather(*(conn.execute(text("SELECT 1")) for conn in conns))
+    if len(conns) < len(results):
+        raise next(r for r in results if isinstance(r, BaseException))
+
+
+async def warm_redirect_cache(limit: int) -> int:
+    """Load the links clicked most since yesterday (UTC) into the in-process redirect cache."""
+    since = day_bucket(datetime.now(timezone.utc) - timedelta(days=1))
+    hot = (
+        select(LinkClickRollup.link_id, func.sum(LinkClickRollup.clicks).label("clicks"))
+        .where(LinkClickRollup.bucket >= since)
+        .group_by(LinkClickRollup.link_id)
+        .order_by(func.sum(LinkClickRollup.clicks).desc())
+        .limit(limit)
+        .subquery()
+    )
+    # The primary, like redirect cache misses: URLs read from a lagging
+    # replica could undo a recent edit until the entry expires.
+    async with engine.connect() as conn:
+        rows = (await conn.execute(select(Link.id, Link.url).join(hot, hot.c.link_id == Link.id))).all()
+    # Local tier only: Redis, when configured, is shared and already warm.
+    for link_id, url in rows:
+        redirect_cache.local.set(link_id, url)
+    return len(rows)
+
+
+def preload_lazy_modules() -> None:
+    """
+    Import what the first AI insight or auth request would otherwise import
+    on the event loop. Run in a thread after startup, so it never delays
+    serving.
+    """
+    try:
+        from services.ai_insight import get_client
+        from core.security import _jwt
+
+        get_client()
+        _jwt()
+    except Exception:
+        logger.warning("Preloading lazy modules failed; they load on first use instead", exc_info=True)
+
+
+async def warm_up() -> None:
+    """
+    Run at startup, before the worker takes traffic: fill the connection
+    pools, open the Redis connection, map the common password index and
+    preload hot redirects. Failures are logged, never fatal; everything
+    warmed here is also created on demand.
+    """
+    started = time.perf_counter()
+
+    async def step(name: str, awaitable):
+        try:
+            await awaitable
+        except Exception:
+            logger.warning("Startup warmup of %s failed", name, exc_info=True)
+
+    connections = min(settings.DB_POOL_WARMUP_CONNECTIONS, settings.DB_POOL_SIZE)
+    steps = [step("password index", asyncio.to_thread(load_common_passwords))]
+    if connections > 0:
+        steps.append(step("primary pool", warm_pool(engine, connections)))
+        if read_engine is not engine:
+            steps.append(step("replica pool", warm_pool(read_engine, connections)))
+    if (redis := get_redis()) is not None:
+        steps.append(step("redis", redis.ping()))
+
+    try:
+        async with asyncio.timeout(settings.STARTUP_WARMUP_TIMEOUT_SECONDS):
+            await asyncio.gather(*steps)
+            # Runs on the pool warmed above.
+            if settings.REDIRECT_CACHE_WARMUP_LINKS > 0:
+                await step("redirect cache", warm_redirect_cache(settings.REDIRECT_CACHE_WARMUP_LINKS))
+    except TimeoutError:
+        logger.warning("Startup warmup gave up after %.1fs", settings.STARTUP_WARMUP_TIMEOUT_SECONDS)
+        return
+    logger.info("Startup warmup finished in %.1f ms", (time.perf_counter() - started) * 1000)